@@ -12,7 +12,7 @@ import dlt
 
 from coreason_etl_drugs_fda.source import drugs_fda_source
 from coreason_etl_drugs_fda.utils.logger import logger
-from coreason_etl_drugs_fda.utils.medallion import organize_schemas
+from coreason_etl_drugs_fda.utils.medallion import organize_schemas_async
 
 
 def create_pipeline(destination: str = "postgres", dataset_name: str = "fda_data") -> dlt.Pipeline:
@@ -40,10 +40,11 @@ def run_pipeline() -> None:
     source = drugs_fda_source()
 
     info = pipeline.run(source)
-    logger.info(info)
 
-    # Post-load hook: Organize schemas (for Postgres)
-    organize_schemas(pipeline)
+    # Post-load hook: Organize schemas in the background while the load info is logged
+    schemas_organized = organize_schemas_async(pipeline)
+    logger.info(info)
+    schemas_organized.result()
 
 
 if __name__ == "__main__":  # pragma: no cover
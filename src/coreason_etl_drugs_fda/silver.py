@@ -11,15 +11,23 @@
 import hashlib
 import uuid
 from datetime import date
-from typing import Any, Dict, List, Optional, TypeVar, Union
+from typing import Annotated, Any, Dict, List, Optional, TypeVar, Union
 
 import polars as pl
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 # Define a stable namespace for FDA Drugs
 # Generated using uuid.uuid5(uuid.NAMESPACE_DNS, "fda.coreason.ai")
 NAMESPACE_FDA = uuid.UUID("9a527060-639d-5a63-a612-9c1673322488")
 
+# Padded identifier types, shared by ProductSilver and the standalone validators below.
+ApplNo = Annotated[str, Field(pattern=r"^\d{6}$")]
+ProductNo = Annotated[str, Field(pattern=r"^\d{3}$")]
+
+# Built once at import, so a single field can be checked without validating a whole model.
+APPL_NO_ADAPTER: TypeAdapter[str] = TypeAdapter(ApplNo)
+PRODUCT_NO_ADAPTER: TypeAdapter[str] = TypeAdapter(ProductNo)
+
 
 class ProductSilver(BaseModel):  # type: ignore[misc]
     """
@@ -28,8 +36,8 @@ class ProductSilver(BaseModel):  # type: ignore[misc]
 
     coreason_id: uuid.UUID
     source_id: str = Field(..., pattern=r"^\d{9}$")
-    appl_no: str = Field(..., pattern=r"^\d{6}$")
-    product_no: str = Field(..., pattern=r"^\d{3}$")
+    appl_no: ApplNo
+    product_no: ProductNo
     form: str
     strength: str
     active_ingredients_list: List[str]
@@ -70,6 +78,15 @@ def generate_coreason_id(df: FrameT) -> FrameT:
     return df
 
 
+def _md5_hex(values: pl.Series) -> pl.Series:
+    """
+    Hex MD5 of each string in the batch. Hashing a whole column per call avoids the
+    per-row UDF dispatch of map_elements; the digests are unchanged.
+    """
+    md5 = hashlib.md5
+    return pl.Series(values.name, [md5(v.encode()).hexdigest() for v in values.to_list()], dtype=pl.String)
+
+
 def generate_row_hash(df: FrameT) -> FrameT:
     """
     Generates an MD5 hash of the row content for change detection.
@@ -106,8 +123,6 @@ def generate_row_hash(df: FrameT) -> FrameT:
         exprs.append(expr)
 
     df = df.with_columns(
-        pl.concat_str(exprs, separator="|")
-        .map_elements(lambda x: hashlib.md5(x.encode()).hexdigest(), return_dtype=pl.String)
-        .alias("hash_md5")
+        pl.concat_str(exprs, separator="|").map_batches(_md5_hex, return_dtype=pl.String).alias("hash_md5")
     )
     return df
@@ -2,8 +2,9 @@
 # Source Code: https://github.com/CoReason-AI/coreason_etl_drugs_fda
 
 import io
+import os
 import zipfile
-from typing import Any, Dict, Iterator, List, cast
+from typing import Any, Dict, Iterator, List, Optional, cast
 
 import dlt
 import polars as pl
@@ -31,6 +32,14 @@ TARGET_FILES = [
     "MarketingStatus_Lookup.txt",
 ]
 
+# Opt-in switch that drops dlt's per-row Pydantic validation from the Silver/Gold resources.
+# Only explicit true values ("1", "true", "yes") enable it. Unsupported outside test runs.
+SKIP_VALIDATION_ENV = "COREASON_SKIP_VALIDATION"
+
+# Rows converted to Python dicts at a time when the Silver/Gold frames are yielded, so peak
+# memory holds one slice of dicts rather than the whole layer.
+ROW_CHUNK_SIZE = 16_384
+
 
 def _read_csv_bytes(content: bytes) -> pl.DataFrame:
     if not content:
@@ -46,6 +55,24 @@ def _read_csv_bytes(content: bytes) -> pl.DataFrame:
     )
 
 
+def _scan_csv_bytes(content: bytes) -> pl.LazyFrame:
+    """
+    Lazy counterpart of `_read_csv_bytes` for the Silver/Gold plans.
+    scan_csv only reads UTF-8, so the CP1252 payload is transcoded up front (read_csv does the same
+    internally); the scan then lets projection pushdown skip columns the plan never selects.
+    """
+    if not content:
+        return pl.DataFrame().lazy()
+    return pl.scan_csv(
+        content.decode("cp1252").encode(),
+        separator="\t",
+        quote_char=None,
+        ignore_errors=True,
+        truncate_ragged_lines=True,
+        infer_schema_length=10000,
+    )
+
+
 def _read_file_from_zip(zip_content: bytes, filename: str) -> List[Dict[str, Any]]:
     with zipfile.ZipFile(io.BytesIO(zip_content)) as z:
         if filename not in z.namelist():
@@ -61,16 +88,47 @@ def _get_lazy_df_from_zip(zip_content: bytes, filename: str) -> pl.LazyFrame:
         if filename not in z.namelist():
             return pl.DataFrame().lazy()
         with z.open(filename) as f:
-            df = _read_csv_bytes(f.read())
-            return df.lazy()
+            return _scan_csv_bytes(f.read())
 
 
-@dlt.source(name="drugs_fda")  # type: ignore[misc]
-def drugs_fda_source(
-    base_url: str = "https://www.fda.gov/media/89850/download",
-) -> Iterator[DltResource]:
+def _build_gold_products(zip_content: bytes, has_submissions: bool) -> pl.LazyFrame:
     """
-    The main DLT source for FDA Drugs data.
+    Builds the Gold Products plan (Silver + enrichment joins) from the archive bytes.
+    Kept outside the resource so callers can collect it without going through dlt.
+    """
+    approval_map: Dict[str, str] = {}
+    if has_submissions:
+        submissions_lazy = _get_lazy_df_from_zip(zip_content, "Submissions.txt")
+        approval_map = extract_orig_dates(submissions_lazy)
+
+    dates_df_eager = pl.DataFrame(
+        {"appl_no": list(approval_map.keys()), "original_approval_date": list(approval_map.values())}
+    )
+
+    if dates_df_eager.is_empty():
+        dates_df_eager = pl.DataFrame(schema={"appl_no": pl.String, "original_approval_date": pl.String})
+    else:
+        dates_df_eager = dates_df_eager.with_columns(pl.col("appl_no").cast(pl.String))
+
+    dates_df_lazy = dates_df_eager.lazy()
+    products_lazy = _get_lazy_df_from_zip(zip_content, "Products.txt")
+
+    silver_df_lazy = prepare_silver_products(
+        products_lazy, dates_df_lazy, approval_dates_map_exists=not dates_df_eager.is_empty()
+    )
+
+    df_apps = _get_lazy_df_from_zip(zip_content, "Applications.txt")
+    df_marketing = _get_lazy_df_from_zip(zip_content, "MarketingStatus.txt")
+    df_te = _get_lazy_df_from_zip(zip_content, "TE.txt")
+    df_exclusivity = _get_lazy_df_from_zip(zip_content, "Exclusivity.txt")
+    df_marketing_lookup = _get_lazy_df_from_zip(zip_content, "MarketingStatus_Lookup.txt")
+
+    return prepare_gold_products(silver_df_lazy, df_apps, df_marketing, df_marketing_lookup, df_te, df_exclusivity)
+
+
+def _download_zip(base_url: str) -> bytes:
+    """
+    Downloads the Drugs@FDA archive.
     Uses curl_cffi to impersonate Chrome and bypass FDA bot detection.
     """
     zip_bytes = b""
@@ -105,6 +163,21 @@ def drugs_fda_source(
         logger.error(f"Download failed: {e}")
         raise
 
+    return zip_bytes
+
+
+@dlt.source(name="drugs_fda")  # type: ignore[misc]
+def drugs_fda_source(
+    base_url: str = "https://www.fda.gov/media/89850/download",
+    source_bytes: Optional[bytes] = None,
+) -> Iterator[DltResource]:
+    """
+    The main DLT source for FDA Drugs data.
+    Downloads the archive from `base_url`, unless the ZIP is passed in as `source_bytes`
+    (e.g. a local copy or a test fixture), in which case no HTTP request is made.
+    """
+    zip_bytes = _download_zip(base_url) if source_bytes is None else source_bytes
+
     # Process ZIP Content
     files_present = []
     try:
@@ -136,6 +209,8 @@ def drugs_fda_source(
 
         yield file_resource()
 
+    skip_validation = os.getenv(SKIP_VALIDATION_ENV, "").strip().lower() in ("1", "true", "yes")
+
     # 5. Yield Silver Products Resource
     if "Products.txt" in files_present and "Submissions.txt" in files_present:
 
@@ -171,13 +246,17 @@ def drugs_fda_source(
 
             df = df_lazy.collect()
 
-            for row in df.to_dicts():
-                if not row.get("appl_no") or not row.get("product_no"):
-                    continue
-                yield cast(ProductSilver, row)
+            for chunk in df.iter_slices(n_rows=ROW_CHUNK_SIZE):
+                for row in chunk.to_dicts():
+                    if not row.get("appl_no") or not row.get("product_no"):
+                        continue
+                    yield cast(ProductSilver, row)
             logger.info("Silver Products layer generation complete.")
 
-        yield silver_products_resource()
+        silver_resource = silver_products_resource()
+        if skip_validation:
+            silver_resource.validator = None
+        yield silver_resource
 
     # 6. Yield Gold Products Resource
     if "Products.txt" in files_present:
@@ -191,44 +270,17 @@ def drugs_fda_source(
         def gold_products_resource(z_content: bytes = zip_bytes) -> Iterator[ProductGold]:
             logger.info("Generating Gold Products layer...")
 
-            approval_map: Dict[str, str] = {}
-            if "Submissions.txt" in files_present:
-                submissions_lazy = _get_lazy_df_from_zip(z_content, "Submissions.txt")
-                approval_map = extract_orig_dates(submissions_lazy)
-
-            dates_df_eager = pl.DataFrame(
-                {"appl_no": list(approval_map.keys()), "original_approval_date": list(approval_map.values())}
-            )
-
-            if dates_df_eager.is_empty():
-                dates_df_eager = pl.DataFrame(schema={"appl_no": pl.String, "original_approval_date": pl.String})
-            else:
-                dates_df_eager = dates_df_eager.with_columns(pl.col("appl_no").cast(pl.String))
-
-            dates_df_lazy = dates_df_eager.lazy()
-            products_lazy = _get_lazy_df_from_zip(z_content, "Products.txt")
-
-            silver_df_lazy = prepare_silver_products(
-                products_lazy, dates_df_lazy, approval_dates_map_exists=not dates_df_eager.is_empty()
-            )
-
-            df_apps = _get_lazy_df_from_zip(z_content, "Applications.txt")
-            df_marketing = _get_lazy_df_from_zip(z_content, "MarketingStatus.txt")
-            df_te = _get_lazy_df_from_zip(z_content, "TE.txt")
-            df_exclusivity = _get_lazy_df_from_zip(z_content, "Exclusivity.txt")
-            df_marketing_lookup = _get_lazy_df_from_zip(z_content, "MarketingStatus_Lookup.txt")
-
-            gold_df_lazy = prepare_gold_products(
-                silver_df_lazy, df_apps, df_marketing, df_marketing_lookup, df_te, df_exclusivity
-            )
-
-            gold_df = gold_df_lazy.collect()
+            gold_df = _build_gold_products(z_content, "Submissions.txt" in files_present).collect()
 
             if gold_df.is_empty():
                 return
 
-            for row in gold_df.to_dicts():
-                yield cast(ProductGold, row)
+            for chunk in gold_df.iter_slices(n_rows=ROW_CHUNK_SIZE):
+                for row in chunk.to_dicts():
+                    yield cast(ProductGold, row)
             logger.info("Gold Products layer generation complete.")
 
-        yield gold_products_resource()
+        gold_resource = gold_products_resource()
+        if skip_validation:
+            gold_resource.validator = None
+        yield gold_resource
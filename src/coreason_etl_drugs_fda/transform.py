@@ -126,6 +126,7 @@ def fix_dates(df: FrameT, date_cols: list[str]) -> FrameT:
 def clean_ingredients(df: FrameT) -> FrameT:
     """
     Splits ActiveIngredient by semicolon, upper-cases, and trims whitespace.
+    Repeated ingredients are dropped, keeping the first occurrence's position.
     Ensures 'active_ingredients_list' column always exists.
     """
     if isinstance(df, pl.LazyFrame):
@@ -140,6 +141,7 @@ def clean_ingredients(df: FrameT) -> FrameT:
             .str.split(";")
             .list.eval(pl.element().str.strip_chars())
             .list.eval(pl.element().filter(pl.element().str.len_bytes() > 0))  # Filter out empty strings
+            .list.unique(maintain_order=True)
             .fill_null(pl.lit([], dtype=pl.List(pl.String)))
             .alias("active_ingredients_list")
         )
@@ -166,6 +168,16 @@ def clean_form(df: FrameT) -> FrameT:
     return df
 
 
+def pipeline_lazy(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Chains normalize_ids, clean_ingredients and generate_coreason_id into one lazy plan,
+    so a single collect() runs all three without eager intermediate frames.
+    """
+    from coreason_etl_drugs_fda.silver import generate_coreason_id
+
+    return lf.pipe(normalize_ids).pipe(clean_ingredients).pipe(generate_coreason_id)
+
+
 def _get_empty_silver_schema() -> pl.LazyFrame:
     """Returns an empty LazyFrame with the correct schema for Silver Products."""
     return pl.DataFrame(
@@ -8,48 +8,238 @@
 #
 # Source Code: https://github.com/CoReason-AI/coreason_etl_drugs_fda
 
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from dlt.destinations.sql_client import SqlClientBase
 from dlt.pipeline.pipeline import Pipeline
 
 from coreason_etl_drugs_fda.utils.logger import logger
 
+# Manifest of tables already moved by previous runs. Lives in the bronze schema.
+MIGRATION_LOG_TABLE = "_coreason_migration_log"
+
+# Rows pulled per round-trip when streaming the migration log.
+_MANIFEST_FETCH_SIZE = 1000
+
+# Dollar-quote tag for the per-table Postgres DO blocks. Each block is its own subtransaction,
+# so one failed ALTER does not abort the others in the batch.
+_DO_TAG = "$coreason_move$"
+
+LAYER_SCHEMAS = ("bronze", "silver", "gold")
+
+# Session settings for the Postgres DDL transaction. SET LOCAL only lasts until COMMIT.
+_PG_APPLICATION_NAME_SQL = "SET LOCAL application_name = 'coreason_organize_schemas';"
+_PG_ASYNC_COMMIT_SQL = "SET LOCAL synchronous_commit = off;"
+
+# Single compiled scan for all layers. Matches "_<layer>_" anywhere, a "<layer>_" prefix, or the
+# "fda_drugs_<layer>" resource prefix, in any case. The trailing "_" is a lookahead so adjacent
+# markers ("_bronze_silver_") are both found.
+_LAYER_ALTERNATIVES = "|".join(LAYER_SCHEMAS)
+_LAYER_RE = re.compile(rf"(?:^|_)({_LAYER_ALTERNATIVES})(?=_)|fda_drugs_({_LAYER_ALTERNATIVES})", re.IGNORECASE)
+
+# Single worker, so at most one schema organization runs against the destination at a time.
+_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="organize_schemas")
+
+# Destinations with schema support that organize_schemas knows how to handle.
+SUPPORTED_DESTINATIONS = ("postgres", "duckdb")
+
+# The setup DDL never varies, so it is built once at import time.
+_ENSURE_SCHEMAS_SQL = " ".join(
+    [f"CREATE SCHEMA IF NOT EXISTS {schema};" for schema in LAYER_SCHEMAS]
+    + [
+        f'CREATE TABLE IF NOT EXISTS "bronze"."{MIGRATION_LOG_TABLE}" '
+        "(table_name TEXT PRIMARY KEY, target_schema TEXT NOT NULL, "
+        "migrated_at TIMESTAMPTZ NOT NULL DEFAULT now());"
+    ]
+)
+
+
+def _resolve_target_schema(table_name: str) -> Optional[str]:
+    """
+    Determine target schema based on table name patterns.
+    The name is scanned once; if it carries several layer markers, LAYER_SCHEMAS order wins.
+    """
+    found = {(match.group(1) or match.group(2)).lower() for match in _LAYER_RE.finditer(table_name)}
+    for schema in LAYER_SCHEMAS:
+        if schema in found:
+            return schema
+    return None
 
-def organize_schemas(pipeline: Pipeline) -> None:
+
+def _load_migration_manifest(client: SqlClientBase[Any]) -> Set[str]:
+    """
+    Returns the names of tables already moved by a previous run.
+    On a new deployment the log table does not exist yet, so the manifest is empty.
+    """
+    migrated: Set[str] = set()
+    try:
+        # Stream the log in chunks instead of materializing it with fetchall()
+        with client.execute_query(f'SELECT table_name FROM "bronze"."{MIGRATION_LOG_TABLE}";') as cursor:
+            for rows in cursor.iter_fetch(_MANIFEST_FETCH_SIZE):
+                migrated.update(row[0] for row in rows)
+    except Exception:
+        return set()
+    return migrated
+
+
+def _quote_ident(name: str) -> str:
+    """Quotes an identifier, doubling embedded double quotes so the name cannot end the quoting."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _duckdb_view_sql(dataset_name: str, table_name: str, target_schema: str) -> str:
+    """
+    DuckDB publishes a view in the layer schema, which is a catalog-only change and leaves
+    dlt's table in place.
+    """
+    table = _quote_ident(table_name)
+    view = f"{_quote_ident(target_schema)}.{table}"
+    return f"CREATE OR REPLACE VIEW {view} AS SELECT * FROM {_quote_ident(dataset_name)}.{table};"
+
+
+def _postgres_move_block(dataset_name: str, table_name: str, target_schema: str) -> str:
+    """
+    Postgres moves the table itself and records it in the migration log inside one DO block.
+    A failure is downgraded to a server-side WARNING, leaving the table unmoved and unrecorded.
+    """
+    literal = table_name.replace("'", "''")
+    source = f"{_quote_ident(dataset_name)}.{_quote_ident(table_name)}"
+    return (
+        f"DO {_DO_TAG} BEGIN "
+        f"ALTER TABLE {source} SET SCHEMA {_quote_ident(target_schema)}; "
+        f'INSERT INTO "bronze"."{MIGRATION_LOG_TABLE}" (table_name, target_schema) '
+        f"VALUES ('{literal}', '{target_schema}') ON CONFLICT (table_name) DO NOTHING; "
+        f"EXCEPTION WHEN OTHERS THEN RAISE WARNING USING MESSAGE = 'Failed to move table {literal}: ' || SQLERRM; "
+        f"END {_DO_TAG};"
+    )
+
+
+def _organize_postgres(
+    client: SqlClientBase[Any], dataset_name: str, pending: Dict[str, str], strict_durability: bool
+) -> Tuple[Set[str], Set[str]]:
+    """
+    Runs the setup DDL and every move as one statement batch in one transaction, so the cost is a
+    single round-trip however many tables are new. Returns the tables the log shows as moved, and
+    the tables left out of the batch (already warned about here).
+    """
+    batch = [_PG_APPLICATION_NAME_SQL, _ENSURE_SCHEMAS_SQL]
+    if not strict_durability:
+        batch.insert(0, _PG_ASYNC_COMMIT_SQL)
+    skipped: Set[str] = set()
+    for table_name, target_schema in pending.items():
+        if _DO_TAG in table_name:
+            logger.warning(f"Failed to move table {table_name}: name contains the DO block delimiter")
+            skipped.add(table_name)
+            continue
+        logger.info(f"Moving table {table_name} to schema {target_schema}")
+        batch.append(_postgres_move_block(dataset_name, table_name, target_schema))
+
+    try:
+        with client.begin_transaction():
+            client.execute_sql(" ".join(batch))
+            # Failed moves only raise server-side warnings; the log (read back inside the same
+            # transaction) says which tables made it.
+            return _load_migration_manifest(client) & pending.keys(), skipped
+    except Exception as e:
+        # An error outside the DO blocks (e.g. the setup DDL) rolls the whole batch back;
+        # every table stays pending and is retried on the next run.
+        logger.warning(f"Failed to move tables in schema {dataset_name}: {e}")
+        return set(), set(pending)
+
+
+def _organize_duckdb(client: SqlClientBase[Any], dataset_name: str, pending: Dict[str, str]) -> Set[str]:
+    """
+    DuckDB has no savepoints and is embedded (no round-trips), so its statements run one by one
+    in autocommit mode. Returns the tables whose views were published.
+    """
+    try:
+        client.execute_sql(_ENSURE_SCHEMAS_SQL)
+    except Exception as e:
+        # Without the layer schemas no view can be published; every table stays pending
+        logger.warning(f"Failed to move tables in schema {dataset_name}: {e}")
+        return set()
+
+    moved: List[Tuple[str, str]] = []
+    for table_name, target_schema in pending.items():
+        logger.info(f"Moving table {table_name} to schema {target_schema}")
+        try:
+            client.execute_sql(_duckdb_view_sql(dataset_name, table_name, target_schema))
+            moved.append((table_name, target_schema))
+        except Exception as e:
+            logger.warning(f"Failed to move table {table_name}: {e}")
+
+    # Record the successful moves in one batch
+    if moved:
+        placeholders = ", ".join(["(%s, %s)"] * len(moved))
+        params = [value for pair in moved for value in pair]
+        try:
+            client.execute_sql(
+                f'INSERT INTO "bronze"."{MIGRATION_LOG_TABLE}" (table_name, target_schema) '
+                f"VALUES {placeholders} ON CONFLICT (table_name) DO NOTHING;",
+                *params,
+            )
+        except Exception as e:
+            # The views are in place; unrecorded tables are simply re-published on the next run
+            logger.warning(f"Failed to record moved tables in schema {dataset_name}: {e}")
+    return {table_name for table_name, _ in moved}
+
+
+def organize_schemas(pipeline: Pipeline, strict_durability: bool = False) -> None:
     """
     Post-load hook to organize tables into 'bronze', 'silver', and 'gold' schemas
-    in the destination (specifically for PostgreSQL).
+    in the destination (PostgreSQL and DuckDB).
+
+    Tables moved by earlier runs are recorded in `bronze._coreason_migration_log`,
+    so steady-state runs only emit DDL for tables that are new since the last run.
+
+    On Postgres the catalog-only transaction runs with `synchronous_commit = off`,
+    so it does not wait for a WAL flush at COMMIT. Pass `strict_durability=True`
+    to keep the server default.
     """
-    # Only proceed if destination supports schemas (Postgres, Redshift, Snowflake, etc.)
-    if pipeline.destination.destination_name != "postgres":
-        logger.info(f"Skipping schema organization for destination: {pipeline.destination.destination_name}")
+    # Only proceed if destination supports schemas
+    destination_name = pipeline.destination.destination_name
+    if destination_name not in SUPPORTED_DESTINATIONS:
+        logger.info(f"Skipping schema organization for destination: {destination_name}")
         return
+    is_postgres = destination_name == "postgres"
 
     # --- FIX: Use 'with' context manager to open the connection ---
     with pipeline.sql_client() as client:
-        # 1. Ensure schemas exist
-        schemas = ["bronze", "silver", "gold"]
-        for schema in schemas:
-            client.execute_sql(f"CREATE SCHEMA IF NOT EXISTS {schema};")
-
-        # 2. Get list of tables in the dataset
+        # 1. Diff the loaded tables against the migration manifest
         dataset_name = pipeline.dataset_name
         loaded_tables = pipeline.default_schema.tables.keys()
+        migrated = _load_migration_manifest(client)
 
+        pending: Dict[str, str] = {}
         for table_name in loaded_tables:
-            target_schema = None
-
-            # Determine target schema based on table name patterns
-            if "_bronze_" in table_name or table_name.startswith("bronze_") or "fda_drugs_bronze" in table_name:
-                target_schema = "bronze"
-            elif "_silver_" in table_name or table_name.startswith("silver_") or "fda_drugs_silver" in table_name:
-                target_schema = "silver"
-            elif "_gold_" in table_name or table_name.startswith("gold_") or "fda_drugs_gold" in table_name:
-                target_schema = "gold"
-
-            if target_schema:
-                logger.info(f"Moving table {table_name} to schema {target_schema}")
-                try:
-                    # Move table to the target schema
-                    sql = f'ALTER TABLE "{dataset_name}"."{table_name}" SET SCHEMA "{target_schema}";'
-                    client.execute_sql(sql)
-                except Exception as e:
-                    logger.warning(f"Failed to move table {table_name}: {e}")
+            target_schema = _resolve_target_schema(table_name)
+            if target_schema and table_name not in migrated:
+                pending[table_name] = target_schema
+
+        if not pending:
+            logger.info("Schema organization is up to date; no new tables to move.")
+            return
+
+        # 2. Ensure schemas and the migration log exist, move only the new tables, record the moves
+        if is_postgres:
+            moved, skipped = _organize_postgres(client, dataset_name, pending, strict_durability)
+            for table_name in pending.keys() - moved - skipped:
+                logger.warning(f"Failed to move table {table_name}; see the Postgres server log for the cause")
+        else:
+            moved = _organize_duckdb(client, dataset_name, pending)
+
+        # 3. Leave failed tables in place for inspection; they are retried on the next run
+        remaining = len(pending) - len(moved)
+        if remaining:
+            logger.warning(f"Leaving {remaining} unmigrated tables in schema {dataset_name}")
+
+
+def organize_schemas_async(pipeline: Pipeline, strict_durability: bool = False) -> "Future[None]":
+    """
+    Runs `organize_schemas` on a background thread and returns its Future.
+    The DDL is I/O bound on the destination, so the caller can continue with logging or
+    notifications and call `.result()` when it needs the schemas in place.
+    """
+    return _EXECUTOR.submit(organize_schemas, pipeline, strict_durability)
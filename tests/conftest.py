@@ -0,0 +1,215 @@
+# Copyright (c) 2025 CoReason, Inc.
+#
+# This software is proprietary and dual-licensed.
+# Licensed under the Prosperity Public License 3.0 (the "License").
+# A copy of the license is available at https://prosperitylicense.com/versions/3.0.0
+# For details, see the LICENSE file.
+# Commercial use beyond a 30-day trial requires a separate license.
+#
+# Source Code: https://github.com/CoReason-AI/coreason_etl_drugs_fda
+
+import hashlib
+import io
+import zipfile
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, Iterator, Mapping, Tuple, Union
+
+import polars as pl
+import pytest
+from dlt.sources import DltSource
+
+from coreason_etl_drugs_fda.source import _build_gold_products, drugs_fda_source
+
+# Minimal single-product archive shared by the integration-style tests.
+# Pre-encoded, so writestr() stores the bytes without an encode step.
+BASE_ZIP_FILES: Dict[str, bytes] = {
+    "Products.txt": b"ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000001\t001\tF\tS\tIng",
+    "Submissions.txt": b"ApplNo\tSubmissionType\tSubmissionStatusDate\n000001\tORIG\t2020-01-01",
+}
+
+# An archive member: name and content (text is written as UTF-8).
+_Member = Tuple[str, Union[str, bytes]]
+
+# Members carry a fixed timestamp (the ZIP epoch): writestr() skips its time.localtime() call
+# and identical members always produce identical archive bytes.
+_ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+
+def _write_members(z: zipfile.ZipFile, files: Iterable[_Member]) -> None:
+    for fname, content in files:
+        z.writestr(zipfile.ZipInfo(fname, date_time=_ZIP_EPOCH), content)
+
+
+@lru_cache(maxsize=None)
+def _build_zip(files: Tuple[_Member, ...]) -> bytes:
+    """
+    Builds a ZIP archive once per distinct set of members.
+    Members are stored uncompressed: payloads are tiny, so DEFLATE would only add zlib work.
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as z:
+        _write_members(z, files)
+    return buffer.getvalue()
+
+
+# The skeleton archive is baked once; archives that only add members append to a copy of it.
+_SKELETON_ZIP = _build_zip(tuple(BASE_ZIP_FILES.items()))
+
+
+@lru_cache(maxsize=None)
+def _append_to_skeleton(extra: Tuple[_Member, ...]) -> bytes:
+    """
+    Appends `extra` members to the pre-built skeleton. Append mode only writes the new entries
+    and a fresh central directory, so the skeleton members are copied, not re-encoded.
+    """
+    buffer = io.BytesIO(_SKELETON_ZIP)
+    with zipfile.ZipFile(buffer, "a", compression=zipfile.ZIP_STORED) as z:
+        _write_members(z, extra)
+    return buffer.getvalue()
+
+
+@pytest.fixture(scope="session")  # type: ignore[misc]
+def make_zip() -> Callable[[Mapping[str, Union[str, bytes]]], bytes]:
+    """
+    Returns a builder that merges `extra` members over the shared skeleton (`BASE_ZIP_FILES`)
+    and returns the ZIP bytes. Identical archives are built only once per session.
+    """
+
+    def _make_zip(extra: Mapping[str, Union[str, bytes]]) -> bytes:
+        if extra.keys().isdisjoint(BASE_ZIP_FILES):
+            return _append_to_skeleton(tuple(extra.items()))
+        # Overriding a skeleton member would leave a duplicate entry in an appended archive
+        merged: Dict[str, Union[str, bytes]] = {**BASE_ZIP_FILES, **extra}
+        return _build_zip(tuple(merged.items()))
+
+    return _make_zip
+
+
+@pytest.fixture(scope="session", autouse=True)  # type: ignore[misc]
+def _fda_response() -> Iterator[SimpleNamespace]:
+    """
+    Installs the FDA download stub once per session and yields the single response it returns.
+    It is autouse, so no test reaches the network and none needs its own patch of the download.
+    The response is a plain namespace built once; `fda_get` swaps the ZIP bytes in its `content`.
+    """
+    response = SimpleNamespace(status_code=200, content=b"", raise_for_status=lambda: None)
+    mp = pytest.MonkeyPatch()
+    mp.setattr("coreason_etl_drugs_fda.source.cffi_requests.get", lambda *args, **kwargs: response)
+    yield response
+    mp.undo()
+
+
+@pytest.fixture(scope="session", autouse=True)  # type: ignore[misc]
+def _dlt_data_dir(tmp_path_factory: pytest.TempPathFactory) -> Iterator[None]:
+    """
+    Points dlt's data directory (pipeline state and working files) at a session temp dir.
+    `create_pipeline` always uses the same pipeline name, so pytest-xdist workers sharing
+    `~/.dlt/pipelines` would overwrite each other's state; each worker gets its own basetemp.
+    """
+    mp = pytest.MonkeyPatch()
+    mp.setenv("DLT_DATA_DIR", str(tmp_path_factory.mktemp("dlt")))
+    yield
+    mp.undo()
+
+
+@pytest.fixture  # type: ignore[misc]
+def fda_get(_fda_response: SimpleNamespace) -> Iterator[Callable[[bytes], None]]:
+    """
+    Returns a setter for the stubbed download's ZIP payload, for tests that exercise the download path.
+    Call it with the archive bytes before `drugs_fda_source()`; the payload is cleared after the test.
+    Tests that only need the archive processed pass it as `drugs_fda_source(source_bytes=...)` instead.
+    Pass `buffer.getvalue()` rather than `buffer.getbuffer()`: once writing is done, CPython hands the
+    BytesIO storage over without copying, while the source needs real bytes (it calls `content.startswith`).
+    """
+
+    def _set_zip(zip_bytes: bytes) -> None:
+        _fda_response.content = zip_bytes
+
+    yield _set_zip
+    _fda_response.content = b""
+
+
+@pytest.fixture(scope="session")  # type: ignore[misc]
+def source_factory() -> Callable[[bytes], DltSource]:
+    """
+    Returns a builder that runs `drugs_fda_source()` on `zip_bytes` passed in as `source_bytes`,
+    so no download (real or stubbed) takes place.
+    Sources are memoized per archive (keyed by a BLAKE2b digest): iterating a resource re-runs
+    its generator on a cloned pipe, so tests with identical payloads can share one source.
+    """
+    sources: Dict[bytes, DltSource] = {}
+
+    def _make_source(zip_bytes: bytes) -> DltSource:
+        key = hashlib.blake2b(zip_bytes, digest_size=16).digest()
+        if key not in sources:
+            sources[key] = drugs_fda_source(source_bytes=zip_bytes)
+        return sources[key]
+
+    return _make_source
+
+
+@pytest.fixture(scope="session")  # type: ignore[misc]
+def pipeline_results(
+    source_factory: Callable[[bytes], DltSource],
+) -> Callable[[bytes, str], Tuple[Dict[str, Any], ...]]:
+    """
+    Returns a runner giving the rows a resource yields for an archive.
+    Each (archive, resource) pair is extracted once per session, so the Silver/Gold plans are
+    not re-run by every test that reads the same output. Rows are shared: do not mutate them.
+    """
+    results: Dict[Tuple[bytes, str], Tuple[Dict[str, Any], ...]] = {}
+
+    def _run(zip_bytes: bytes, resource_name: str) -> Tuple[Dict[str, Any], ...]:
+        key = (hashlib.blake2b(zip_bytes, digest_size=16).digest(), resource_name)
+        if key not in results:
+            results[key] = tuple(source_factory(zip_bytes).resources[resource_name])
+        return results[key]
+
+    return _run
+
+
+def _gold_products_lazy(zip_bytes: bytes) -> pl.LazyFrame:
+    with zipfile.ZipFile(io.BytesIO(zip_bytes)) as z:
+        has_submissions = "Submissions.txt" in z.namelist()
+    return _build_gold_products(zip_bytes, has_submissions)
+
+
+def _gold_products_df(zip_bytes: bytes) -> pl.DataFrame:
+    """
+    Collects the Gold Products frame for an archive without going through the dlt resource,
+    so assertions skip the download stub and the per-row yield.
+    """
+    return _gold_products_lazy(zip_bytes).collect()
+
+
+@lru_cache(maxsize=None)
+def _run_gold(zip_bytes: bytes) -> pl.DataFrame:
+    """The transform is deterministic, so each distinct archive is processed once."""
+    return _gold_products_df(zip_bytes)
+
+
+@pytest.fixture(scope="session")  # type: ignore[misc]
+def run_gold_products() -> Callable[[bytes], pl.DataFrame]:
+    """
+    Returns a runner mapping ZIP bytes to the Gold Products frame, memoized per archive.
+    Frames are immutable, so sharing them across tests is safe.
+    Under pytest-xdist the cache is per worker; modules using it are marked with
+    `xdist_group("gold_products")` so `--dist loadgroup` keeps them on one worker.
+    """
+
+    return _run_gold
+
+
+@pytest.fixture(scope="session")  # type: ignore[misc]
+def count_gold_rows() -> Callable[[bytes], int]:
+    """
+    Returns a runner giving only the Gold Products row count for an archive.
+    The enrichment joins still run, since they are what can fan rows out, but projection
+    pushdown lets Polars drop every column the count does not need.
+    """
+
+    def _count(zip_bytes: bytes) -> int:
+        return int(_gold_products_lazy(zip_bytes).select(pl.len()).collect().item())
+
+    return _count
@@ -8,228 +8,181 @@
 #
 # Source Code: https://github.com/CoReason-AI/coreason_etl_drugs_fda
 
-import io
-import zipfile
-from unittest.mock import MagicMock, patch
-
-from coreason_etl_drugs_fda.source import drugs_fda_source
-
-
-def test_duplicate_source_records_determinism() -> None:
+from typing import Callable, Dict, Mapping, Union
+
+from dlt.sources import DltSource
+
+# Canonical headers, pre-encoded so the archive members are written as-is.
+_PROD_HDR = b"ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n"
+_SUB_HDR = b"ApplNo\tSubmissionType\tSubmissionStatusDate\n"
+
+
+_FIXTURES: Dict[str, Dict[str, bytes]] = {
+    # Two identical rows
+    "duplicate_rows": {
+        "Products.txt": _PROD_HDR + b"000001\t001\tTablet\t10mg\tDrugA\n000001\t001\tTablet\t10mg\tDrugA",
+        "Submissions.txt": _SUB_HDR + b"000001\tORIG\t2020-01-01",
+    },
+    # Submissions file exists but has no entry for 000002
+    "no_matching_orig": {
+        "Products.txt": _PROD_HDR + b"000002\t001\tF\tS\tIng",
+        "Submissions.txt": _SUB_HDR + b"999999\tORIG\t2020-01-01",
+    },
+    # ApplNo with hyphen
+    "hyphenated_appl_no": {
+        "Products.txt": _PROD_HDR + b"12-34\t001\tF\tS\tIng",
+        "Submissions.txt": _SUB_HDR + b"12-34\tORIG\t2020-01-01",
+    },
+    # Strength is empty string (tab tab)
+    "empty_strength": {
+        "Products.txt": _PROD_HDR + b"000003\t001\tF\t\tIng",
+        "Submissions.txt": _SUB_HDR + b"000003\tORIG\t2020-01-01",
+    },
+    # 1000 products, each with an ORIG submission
+    "thousand_products": {
+        "Products.txt": _PROD_HDR + b"\n".join(b"%06d\t001\tF\tS\tIng" % i for i in range(1000)),
+        "Submissions.txt": _SUB_HDR + b"\n".join(b"%06d\tORIG\t2020-01-01" % i for i in range(1000)),
+    },
+    # UPPER CASE HEADERS
+    "upper_case_headers": {
+        "Products.txt": b"APPLNO\tPRODUCTNO\tFORM\tSTRENGTH\tACTIVEINGREDIENT\n000004\t001\tF\tS\tIng",
+        "Submissions.txt": b"APPLNO\tSUBMISSIONTYPE\tSUBMISSIONSTATUSDATE\n000004\tORIG\t2020-01-01",
+    },
+}
+
+
+def test_duplicate_source_records_determinism(
+    source_factory: Callable[[bytes], DltSource], make_zip: Callable[[Mapping[str, Union[str, bytes]]], bytes]
+) -> None:
     """
     Test that duplicate identical records in Products.txt produce identical coreason_ids.
     dlt's merge disposition with primary key should deduplicate these into a single state entry,
     but the resource yields them. We verify they yield with same ID.
     """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        # Two identical rows
-        content = (
-            "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n"
-            "000001\t001\tTablet\t10mg\tDrugA\n"
-            "000001\t001\tTablet\t10mg\tDrugA"
-        )
-        z.writestr("Products.txt", content)
-        z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n000001\tORIG\t2020-01-01")
-
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        silver_res = list(source.resources["fda_drugs_silver_products"])
-
-        # Should yield 2 items
-        assert len(silver_res) == 2
-        # Both must have same coreason_id
-        assert silver_res[0]["coreason_id"] == silver_res[1]["coreason_id"]
-
-
-def test_missing_submission_data_left_join() -> None:
+    source = source_factory(make_zip(_FIXTURES["duplicate_rows"]))
+    silver_res = list(source.resources["fda_drugs_silver_products"])
+
+    # Should yield 2 items
+    assert len(silver_res) == 2
+    # Both must have same coreason_id
+    assert silver_res[0]["coreason_id"] == silver_res[1]["coreason_id"]
+
+
+def test_missing_submission_data_left_join(
+    source_factory: Callable[[bytes], DltSource], make_zip: Callable[[Mapping[str, Union[str, bytes]]], bytes]
+) -> None:
     """
     Test behavior when a Product exists but has NO matching ORIG submission.
     The join in source.py is a LEFT JOIN.
     Expectation: original_approval_date is None.
     """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        z.writestr("Products.txt", "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000002\t001\tF\tS\tIng")
-        # Submissions file exists but has no entry for 000002
-        z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n999999\tORIG\t2020-01-01")
-
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_get.return_value = mock_response
+    source = source_factory(make_zip(_FIXTURES["no_matching_orig"]))
+    silver_res = list(source.resources["fda_drugs_silver_products"])
 
-        source = drugs_fda_source()
-        silver_res = list(source.resources["fda_drugs_silver_products"])
+    assert len(silver_res) == 1
+    assert silver_res[0]["appl_no"] == "000002"
+    # Date should be None (Optional field)
+    assert silver_res[0]["original_approval_date"] is None
 
-        assert len(silver_res) == 1
-        assert silver_res[0]["appl_no"] == "000002"
-        # Date should be None (Optional field)
-        assert silver_res[0]["original_approval_date"] is None
 
-
-def test_special_characters_in_ids() -> None:
+def test_special_characters_in_ids(
+    source_factory: Callable[[bytes], DltSource], make_zip: Callable[[Mapping[str, Union[str, bytes]]], bytes]
+) -> None:
     """
     Test IDs with special characters that might persist.
     ApplNo: "12-34" -> "012-34"? Or just "012-34".
     Our normalization pads with 0.
     """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        # ApplNo with hyphen
-        z.writestr("Products.txt", "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n12-34\t001\tF\tS\tIng")
-        z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n12-34\tORIG\t2020-01-01")
-
-    buffer.seek(0)
+    source = source_factory(make_zip(_FIXTURES["hyphenated_appl_no"]))
 
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_get.return_value = mock_response
+    # "12-34" (5 chars) is normalized by our logic:
+    # 1. strip_chars()
+    # 2. regex remove non-digit -> "1234"
+    # 3. pad_start(6, "0") -> "001234"
+    # So it becomes valid "001234" and succeeds.
 
-        source = drugs_fda_source()
+    silver_res = list(source.resources["fda_drugs_silver_products"])
+    assert len(silver_res) == 1
+    assert silver_res[0]["appl_no"] == "001234"
 
-        # "12-34" (5 chars) is normalized by our logic:
-        # 1. strip_chars()
-        # 2. regex remove non-digit -> "1234"
-        # 3. pad_start(6, "0") -> "001234"
-        # So it becomes valid "001234" and succeeds.
 
-        silver_res = list(source.resources["fda_drugs_silver_products"])
-        assert len(silver_res) == 1
-        assert silver_res[0]["appl_no"] == "001234"
-
-
-def test_empty_string_fields() -> None:
+def test_empty_string_fields(
+    source_factory: Callable[[bytes], DltSource], make_zip: Callable[[Mapping[str, Union[str, bytes]]], bytes]
+) -> None:
     """
     Test essential fields being empty strings (not null).
     """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        # Strength is empty string (tab tab)
-        content = "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000003\t001\tF\t\tIng"
-        z.writestr("Products.txt", content)
-        z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n000003\tORIG\t2020-01-01")
-
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        silver_res = list(source.resources["fda_drugs_silver_products"])
+    source = source_factory(make_zip(_FIXTURES["empty_strength"]))
+    silver_res = list(source.resources["fda_drugs_silver_products"])
 
-        assert len(silver_res) == 1
-        # Pydantic model allows empty strings for Strength?
-        # class ProductSilver: strength: str. No regex.
-        # So it should pass.
-        assert silver_res[0]["strength"] == ""
+    assert len(silver_res) == 1
+    # Pydantic model allows empty strings for Strength?
+    # class ProductSilver: strength: str. No regex.
+    # So it should pass.
+    assert silver_res[0]["strength"] == ""
 
 
-def test_large_file_iteration() -> None:
+def test_large_file_iteration(
+    source_factory: Callable[[bytes], DltSource], make_zip: Callable[[Mapping[str, Union[str, bytes]]], bytes]
+) -> None:
     """
     Simulate a larger file to ensure iteration and memory handling logic doesn't crash immediately.
     We won't create huge files to avoid slowing tests, but we'll do 1000 rows.
     """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        rows = []
-        for i in range(1000):
-            rows.append(f"{i:06d}\t001\tF\tS\tIng")
-
-        content = "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n" + "\n".join(rows)
-        z.writestr("Products.txt", content)
-
-        # Submissions for all
-        sub_rows = []
-        for i in range(1000):
-            sub_rows.append(f"{i:06d}\tORIG\t2020-01-01")
-        sub_content = "ApplNo\tSubmissionType\tSubmissionStatusDate\n" + "\n".join(sub_rows)
-        z.writestr("Submissions.txt", sub_content)
-
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        silver_res = list(source.resources["fda_drugs_silver_products"])
+    source = source_factory(make_zip(_FIXTURES["thousand_products"]))
+    silver_res = list(source.resources["fda_drugs_silver_products"])
 
-        assert len(silver_res) == 1000
+    assert len(silver_res) == 1000
 
 
-def test_mixed_case_headers() -> None:
+def test_mixed_case_headers(
+    source_factory: Callable[[bytes], DltSource], make_zip: Callable[[Mapping[str, Union[str, bytes]]], bytes]
+) -> None:
     """
     Test that column normalization handles mixed case headers correctly (e.g. APPLNO vs ApplNo).
     """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        # UPPER CASE HEADERS
-        z.writestr("Products.txt", "APPLNO\tPRODUCTNO\tFORM\tSTRENGTH\tACTIVEINGREDIENT\n000004\t001\tF\tS\tIng")
-        z.writestr("Submissions.txt", "APPLNO\tSUBMISSIONTYPE\tSUBMISSIONSTATUSDATE\n000004\tORIG\t2020-01-01")
-
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-
-        # Should handle it because _clean_dataframe uses _to_snake_case
-        # APPLNO -> applno?
-        # _to_snake_case regex:
-        # (1) (.)([A-Z][a-z]+) -> \1_\2
-        # (2) ([a-z0-9])([A-Z]) -> \1_\2
-        # APPLNO -> No match for (1) because no lower case.
-        # No match for (2) because no lower case.
-        # Result: "applno" (lower()).
-
-        # EXPECTED: "appl_no".
-        # If header is "APPLNO", snake case is "applno".
-        # "ApplNo" -> "Appl_No"? No.
-        # "ApplNo": (.)([A-Z][a-z]+) -> l No -> l_No. -> Appl_No. -> appl_no.
-        # "APPLNO" -> "applno".
-
-        # If the code relies on "appl_no", then "applno" will fail lookup?
-        # Let's check source.py usage.
-        # It references `pl.col("appl_no")`.
-
-        # So if input is APPLNO, it becomes applno, and pl.col("appl_no") fails.
-        # This test ensures we identify if we need robust header mapping or if standard FDA files are consistent.
-        # BRD says "Column Names: 1:1 mapping with Source TSV headers".
-        # But FDA headers are usually CamelCase (ApplNo).
-        # If they change case, our code breaks. This test confirms that fragility (or robustness if we fix it).
-
-        # We expect this to SUCCEED because dlt's NamingConvention handles mixed case headers robustly.
-        # APPLNO -> applno, ApplNo -> appl_no is not strictly true for standard dlt snake_casing.
-        # Wait, my logic in `clean_dataframe` iterates headers and calls `to_snake_case`.
-        # If headers are ALL CAPS "APPLNO", `to_snake_case("APPLNO")` -> "applno" (usually).
-        # But `prepare_silver_products` expects "appl_no".
-        # If "applno" != "appl_no", then it fails?
-        # BUT: The test actually PASSED (Did not raise Exception), which means it yielded data successfully?
-        # Let's inspect the output.
-
-        resources = list(source.resources["fda_drugs_silver_products"])
-        # If list is empty, it "passed" extraction but maybe filtered out rows?
-        # Or maybe "APPLNO" -> "appl_no"?
-        # dlt NamingConvention("APPLNO") -> "applno" usually.
-        # Let's verify row content if any.
-
-        # If dlt handles it, great. If not, we assert what happened.
-        # Since previous run said "Failed: DID NOT RAISE", it implies it ran successfully.
-        assert len(resources) >= 0
+    source = source_factory(make_zip(_FIXTURES["upper_case_headers"]))
+
+    # Should handle it because _clean_dataframe uses _to_snake_case
+    # APPLNO -> applno?
+    # _to_snake_case regex:
+    # (1) (.)([A-Z][a-z]+) -> \1_\2
+    # (2) ([a-z0-9])([A-Z]) -> \1_\2
+    # APPLNO -> No match for (1) because no lower case.
+    # No match for (2) because no lower case.
+    # Result: "applno" (lower()).
+
+    # EXPECTED: "appl_no".
+    # If header is "APPLNO", snake case is "applno".
+    # "ApplNo" -> "Appl_No"? No.
+    # "ApplNo": (.)([A-Z][a-z]+) -> l No -> l_No. -> Appl_No. -> appl_no.
+    # "APPLNO" -> "applno".
+
+    # If the code relies on "appl_no", then "applno" will fail lookup?
+    # Let's check source.py usage.
+    # It references `pl.col("appl_no")`.
+
+    # So if input is APPLNO, it becomes applno, and pl.col("appl_no") fails.
+    # This test ensures we identify if we need robust header mapping or if standard FDA files are consistent.
+    # BRD says "Column Names: 1:1 mapping with Source TSV headers".
+    # But FDA headers are usually CamelCase (ApplNo).
+    # If they change case, our code breaks. This test confirms that fragility (or robustness if we fix it).
+
+    # We expect this to SUCCEED because dlt's NamingConvention handles mixed case headers robustly.
+    # APPLNO -> applno, ApplNo -> appl_no is not strictly true for standard dlt snake_casing.
+    # Wait, my logic in `clean_dataframe` iterates headers and calls `to_snake_case`.
+    # If headers are ALL CAPS "APPLNO", `to_snake_case("APPLNO")` -> "applno" (usually).
+    # But `prepare_silver_products` expects "appl_no".
+    # If "applno" != "appl_no", then it fails?
+    # BUT: The test actually PASSED (Did not raise Exception), which means it yielded data successfully?
+    # Let's inspect the output.
+
+    resources = list(source.resources["fda_drugs_silver_products"])
+    # If list is empty, it "passed" extraction but maybe filtered out rows?
+    # Or maybe "APPLNO" -> "appl_no"?
+    # dlt NamingConvention("APPLNO") -> "applno" usually.
+    # Let's verify row content if any.
+
+    # If dlt handles it, great. If not, we assert what happened.
+    # Since previous run said "Failed: DID NOT RAISE", it implies it ran successfully.
+    assert len(resources) >= 0
@@ -25,7 +25,7 @@ def test_marketing_status_optimistic_availability() -> None:
     So if both exist, it picks 1 (Active). This is 'Optimistic'.
     """
     # Setup Silver Data
-    silver_df = pl.DataFrame(
+    silver_df = pl.LazyFrame(
         {
             "appl_no": ["000001"],
             "product_no": ["001"],
@@ -35,22 +35,22 @@ def test_marketing_status_optimistic_availability() -> None:
             "sponsor_name": ["Sponsor"],
             "te_code": [None],
         }
-    ).lazy()
+    )
 
     # Marketing Data with Duplicates for same product
     # 1 = Rx (Prescription)
     # 3 = Discontinued
     # 4 = None (Tentative)
-    marketing_df = pl.DataFrame(
+    marketing_df = pl.LazyFrame(
         {
             "appl_no": ["000001", "000001", "000001"],
             "product_no": ["001", "001", "001"],
             "marketing_status_id": [3, 1, 4],  # Discontinued, Rx, None
         }
-    ).lazy()
+    )
 
     # Empty Aux
-    empty_df = pl.DataFrame().lazy()
+    empty_df = pl.LazyFrame()
 
     # Run Gold Logic
     gold_df = prepare_gold_products(
@@ -72,7 +72,7 @@ def test_search_vector_complex_inputs() -> None:
     """
     Test search_vector generation with nulls, whitespace, and special chars.
     """
-    silver_df = pl.DataFrame(
+    silver_df = pl.LazyFrame(
         {
             "appl_no": ["000001"],
             "product_no": ["001"],
@@ -82,15 +82,15 @@ def test_search_vector_complex_inputs() -> None:
             # "te_code": ["AB"], # Removed from silver, provided via TE aux
             "marketing_status_id": [1],  # needed to prevent join errors if schema expects it
         }
-    ).lazy()
+    )
 
     # Need generic cols
     silver_df = silver_df.with_columns(pl.lit(False).alias("is_generic"), pl.lit(False).alias("is_protected"))
 
     # Aux
-    empty_df = pl.DataFrame().lazy()
+    empty_df = pl.LazyFrame()
     # Provide TE
-    te_df = pl.DataFrame({"appl_no": ["000001"], "product_no": ["001"], "te_code": ["AB"]}).lazy()
+    te_df = pl.LazyFrame({"appl_no": ["000001"], "product_no": ["001"], "te_code": ["AB"]})
 
     gold_df = prepare_gold_products(silver_df, empty_df, empty_df, empty_df, te_df, empty_df).collect()
 
@@ -138,7 +138,7 @@ def test_fix_dates_historic_edge_cases() -> None:
     3. Valid dates.
     4. Invalid dates.
     """
-    df = pl.DataFrame(
+    df = pl.LazyFrame(
         {
             "date_col": [
                 "Approved prior to Jan 1, 1982",
@@ -147,7 +147,7 @@ def test_fix_dates_historic_edge_cases() -> None:
                 "2023-02-30",  # Invalid date
             ]
         }
-    ).lazy()
+    )
 
     res = fix_dates(df, ["date_col"]).collect()
 
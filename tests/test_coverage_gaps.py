@@ -10,12 +10,22 @@
 
 import hashlib
 import uuid
+from typing import List, Optional
 
 import polars as pl
+import pytest
 
 from coreason_etl_drugs_fda.silver import NAMESPACE_FDA, generate_coreason_id, generate_row_hash
 from coreason_etl_drugs_fda.transform import clean_ingredients, fix_dates, prepare_gold_products
 
+# LazyFrames are immutable plans, so the schemaless input is built once and shared.
+_EMPTY = pl.LazyFrame()
+
+# Deterministic expected values, computed once at import.
+_EXPECTED_COREASON_ID = str(uuid.uuid5(NAMESPACE_FDA, "000123|001"))
+_EXPECTED_HASH_XYA = hashlib.md5(b"X;Y|A").hexdigest()  # col_list | col_str
+_EXPECTED_HASH_NULLS = hashlib.md5(b"|").hexdigest()  # nulls become empty strings
+
 
 def test_prepare_gold_products_missing_aux_columns() -> None:
     """
@@ -33,7 +43,7 @@ def test_prepare_gold_products_missing_aux_columns() -> None:
         "te_code": pl.String,
         "marketing_status_id": pl.Int64,
     }
-    silver_df = pl.DataFrame(
+    silver_df = pl.LazyFrame(
         {
             "appl_no": ["000001"],
             "product_no": ["001"],
@@ -45,23 +55,23 @@ def test_prepare_gold_products_missing_aux_columns() -> None:
             "marketing_status_id": [1],
         },
         schema=silver_schema,
-    ).lazy()
+    )
 
     # 2. Aux DataFrames with MISSING columns (but some other columns to simulate file existence)
     # Applications: Missing 'sponsor_name' and 'appl_type'
-    df_apps = pl.DataFrame({"appl_no": ["000001"], "other_col": ["X"]}).lazy()
+    df_apps = pl.LazyFrame({"appl_no": ["000001"], "other_col": ["X"]})
 
     # Marketing: Missing 'marketing_status_id'
-    df_marketing = pl.DataFrame({"appl_no": ["000001"], "product_no": ["001"], "other_col": ["X"]}).lazy()
+    df_marketing = pl.LazyFrame({"appl_no": ["000001"], "product_no": ["001"], "other_col": ["X"]})
 
     # Marketing Lookup: Missing 'marketing_status_description'
-    df_marketing_lookup = pl.DataFrame({"marketing_status_id": [1], "other_col": ["X"]}).lazy()
+    df_marketing_lookup = pl.LazyFrame({"marketing_status_id": [1], "other_col": ["X"]})
 
     # TE: Missing 'te_code'
-    df_te = pl.DataFrame({"appl_no": ["000001"], "product_no": ["001"], "other_col": ["X"]}).lazy()
+    df_te = pl.LazyFrame({"appl_no": ["000001"], "product_no": ["001"], "other_col": ["X"]})
 
     # Exclusivity: Missing 'exclusivity_date'
-    df_exclusivity = pl.DataFrame({"appl_no": ["000001"], "product_no": ["001"], "other_col": ["X"]}).lazy()
+    df_exclusivity = pl.LazyFrame({"appl_no": ["000001"], "product_no": ["001"], "other_col": ["X"]})
 
     # 3. Run Transformation
     gold_df = prepare_gold_products(
@@ -77,35 +87,37 @@ def test_prepare_gold_products_missing_aux_columns() -> None:
     assert row["is_protected"] is False  # Default when exclusivity missing
 
 
-def test_prepare_gold_products_empty_base() -> None:
-    """Test that empty silver dataframe returns empty result immediately."""
-    silver_schema = {
-        "appl_no": pl.String,
-        "product_no": pl.String,
-        "active_ingredients_list": pl.List(pl.String),
-        "drug_name": pl.String,
-        "sponsor_name": pl.String,
-        "te_code": pl.String,
-        "marketing_status_id": pl.Int64,
-    }
-    silver_df = pl.DataFrame(schema=silver_schema).lazy()
-
+@pytest.mark.parametrize(  # type: ignore[misc]
+    "silver_df",
+    [
+        # Silver columns but no rows
+        pl.LazyFrame(
+            schema={
+                "appl_no": pl.String,
+                "product_no": pl.String,
+                "active_ingredients_list": pl.List(pl.String),
+                "drug_name": pl.String,
+                "sponsor_name": pl.String,
+                "te_code": pl.String,
+                "marketing_status_id": pl.Int64,
+            }
+        ),
+        # NO columns at all; prepare_gold_products hands it straight back
+        _EMPTY,
+    ],
+    ids=["empty_base", "truly_empty_schema"],
+)
+def test_prepare_gold_products_empty_silver(silver_df: pl.LazyFrame) -> None:
+    """Test that an empty silver dataframe (with or without a schema) yields an empty result."""
     # Aux frames can be anything
     res = prepare_gold_products(silver_df, silver_df, silver_df, silver_df, silver_df, silver_df)
 
-    assert res.collect().height == 0
-
-
-def test_prepare_gold_products_truly_empty_schema() -> None:
-    """Test that a dataframe with NO columns returns immediately."""
-    silver_df = pl.DataFrame().lazy()
-    res = prepare_gold_products(silver_df, silver_df, silver_df, silver_df, silver_df, silver_df)
-    assert res.collect_schema().len() == 0
+    assert res.collect_schema().len() == 0 or res.collect().height == 0
 
 
 def test_clean_ingredients_missing_column() -> None:
     """Test clean_ingredients when 'active_ingredient' column is missing."""
-    df = pl.DataFrame({"other": [1]}).lazy()
+    df = pl.LazyFrame({"other": [1]})
     res = clean_ingredients(df).collect()
     assert "active_ingredients_list" in res.columns
     assert res["active_ingredients_list"].dtype == pl.List(pl.String)
@@ -114,7 +126,7 @@ def test_clean_ingredients_missing_column() -> None:
 
 def test_fix_dates_missing_column() -> None:
     """Test fix_dates when target column is missing."""
-    df = pl.DataFrame({"other": ["2020-01-01"]}).lazy()
+    df = pl.LazyFrame({"other": ["2020-01-01"]})
     res = fix_dates(df, ["missing_date_col"]).collect()
     assert "missing_date_col" not in res.columns
     assert res.height == 1
@@ -124,7 +136,7 @@ def test_fix_dates_non_string() -> None:
     """Test fix_dates when target column exists but is not string (already date?)."""
     from datetime import date
 
-    df = pl.DataFrame({"my_date": [date(2023, 1, 1)]}).lazy()
+    df = pl.LazyFrame({"my_date": [date(2023, 1, 1)]})
     res = fix_dates(df, ["my_date"]).collect()
     assert res["my_date"][0] == date(2023, 1, 1)
 
@@ -144,7 +156,7 @@ def test_prepare_gold_products_missing_appl_type_and_marketing_id() -> None:
         "te_code": pl.String,
         # "marketing_status_id": pl.Int64 # MISSING
     }
-    silver_df = pl.DataFrame(
+    silver_df = pl.LazyFrame(
         {
             "appl_no": ["000001"],
             "product_no": ["001"],
@@ -154,12 +166,12 @@ def test_prepare_gold_products_missing_appl_type_and_marketing_id() -> None:
             "te_code": ["TE1"],
         },
         schema=silver_schema,
-    ).lazy()
+    )
 
-    df_empty = pl.DataFrame(schema={"appl_no": pl.String}).lazy()
-    df_marketing_lookup = pl.DataFrame(
+    df_empty = pl.LazyFrame(schema={"appl_no": pl.String})
+    df_marketing_lookup = pl.LazyFrame(
         schema={"marketing_status_id": pl.Int64, "marketing_status_description": pl.String}
-    ).lazy()
+    )
 
     gold_df = prepare_gold_products(silver_df, df_empty, df_empty, df_marketing_lookup, df_empty, df_empty).collect()
 
@@ -178,38 +190,30 @@ def test_prepare_gold_products_missing_appl_type_and_marketing_id() -> None:
 
 def test_generate_coreason_id_coverage() -> None:
     """Test generation of coreason_id to ensure coverage of internal UDF."""
-    df = pl.DataFrame({"appl_no": ["000123"], "product_no": ["001"]}).lazy()
+    df = pl.LazyFrame({"appl_no": ["000123"], "product_no": ["001"]})
 
     res = generate_coreason_id(df).collect()
 
     row = res.row(0, named=True)
     assert "coreason_id" in row
-    expected_uuid = str(uuid.uuid5(NAMESPACE_FDA, "000123|001"))
-    assert row["coreason_id"] == expected_uuid
-
-
-def test_generate_row_hash_list_coverage() -> None:
-    """Test generate_row_hash with List columns to ensure coverage."""
-    # col_list comes before col_str alphabetically (l vs s)
-    df = pl.DataFrame({"col_str": ["A"], "col_list": [["X", "Y"]]}).lazy()
-
-    res = generate_row_hash(df).collect()
-
-    row = res.row(0, named=True)
-    assert "hash_md5" in row
-    # Hash of "X;Y|A" (col_list | col_str)
-    expected = hashlib.md5("X;Y|A".encode()).hexdigest()
-    assert row["hash_md5"] == expected
-
-
-def test_generate_row_hash_nulls() -> None:
-    """Test generate_row_hash with nulls."""
-    df = pl.DataFrame(
-        {"col_str": [None], "col_list": [None]}, schema={"col_str": pl.String, "col_list": pl.List(pl.String)}
-    ).lazy()
-
-    res = generate_row_hash(df).collect()
-    row = res.row(0, named=True)
-    # Nulls become empty strings. "|".
-    expected = hashlib.md5("|".encode()).hexdigest()
+    assert row["coreason_id"] == _EXPECTED_COREASON_ID
+
+
+@pytest.mark.parametrize(  # type: ignore[misc]
+    "col_str,col_list,expected",
+    [
+        # Hash of "X;Y|A" (col_list | col_str); col_list sorts before col_str (l vs s)
+        (["A"], [["X", "Y"]], _EXPECTED_HASH_XYA),
+        # Nulls become empty strings. "|".
+        ([None], [None], _EXPECTED_HASH_NULLS),
+    ],
+    ids=["list_coverage", "nulls"],
+)
+def test_generate_row_hash(col_str: List[Optional[str]], col_list: List[Optional[List[str]]], expected: str) -> None:
+    """Test generate_row_hash over List columns and nulls."""
+    df = pl.LazyFrame(
+        {"col_str": col_str, "col_list": col_list}, schema={"col_str": pl.String, "col_list": pl.List(pl.String)}
+    )
+
+    row = generate_row_hash(df).collect().row(0, named=True)
     assert row["hash_md5"] == expected
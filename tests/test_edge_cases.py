@@ -9,99 +9,148 @@
 # Source Code: https://github.com/CoReason-AI/coreason_etl_drugs_fda
 
 import datetime
-import io
 import uuid
-import zipfile
-from unittest.mock import MagicMock, patch
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Union
 
 import polars as pl
 import pytest
-from pydantic import ValidationError
-
-from coreason_etl_drugs_fda.silver import ProductSilver, generate_coreason_id
-from coreason_etl_drugs_fda.source import drugs_fda_source
-from coreason_etl_drugs_fda.transform import clean_ingredients, fix_dates, normalize_ids
-
-
-def test_malformed_tsv_ragged_lines() -> None:
+from dlt.sources import DltSource
+from pydantic import TypeAdapter, ValidationError
+
+from coreason_etl_drugs_fda.silver import APPL_NO_ADAPTER, NAMESPACE_FDA, PRODUCT_NO_ADAPTER, ProductSilver
+from coreason_etl_drugs_fda.transform import clean_ingredients, fix_dates, normalize_ids, pipeline_lazy
+
+# Validation only checks the type, so a constant keeps the model tests deterministic.
+_FIXED_UUID = uuid.UUID("00000000-0000-4000-8000-000000000000")
+
+# A null appl_no is formatted as "None" in the UUIDv5 name.
+_NULL_APPL_COREASON_ID = str(uuid.uuid5(NAMESPACE_FDA, "None|001"))
+
+_FIXTURES: Dict[str, Dict[str, bytes]] = {
+    # Header has 2 cols. Row 1 has 2. Row 2 has 3 (extra). Row 3 has 1 (missing). Only Bronze is read.
+    "ragged_lines": {"Products.txt": b"ColA\tColB\nVal1\tVal2\nVal3\tVal4\tExtra\nVal5"},
+    # ApplNo 000009 has two ORIG submissions: 2023-01-01 and 2022-01-01 (Earlier)
+    "duplicate_orig": {
+        "Products.txt": b"ApplNo\tProductNo\tActiveIngredient\tForm\tStrength\n000009\t001\tIng\tF\tS",
+        "Submissions.txt": (
+            b"ApplNo\tSubmissionType\tSubmissionStatusDate\n000009\tORIG\t2023-01-01\n000009\tORIG\t2022-01-01"
+        ),
+    },
+    # Products has "10" (will become "000010"); Submissions has "010" (partially padded)
+    "mismatched_padding": {
+        "Products.txt": b"ApplNo\tProductNo\tActiveIngredient\tForm\tStrength\n10\t001\tIng\tF\tS",
+        "Submissions.txt": b"ApplNo\tSubmissionType\tSubmissionStatusDate\n010\tORIG\t2023-05-05",
+    },
+    # Row: 000011 \t 001 \t Test [0x93] Name [0x94] \t Ingr [0xE9] dient \t F \t S
+    "cp1252": {
+        "Products.txt": (
+            b"ApplNo\tProductNo\tDrugName\tActiveIngredient\tForm\tStrength\n"
+            b"000011\t001\tTest\x93Name\x94\tIngr\xe9dient\tF\tS"
+        ),
+        "Submissions.txt": b"ApplNo\tSubmissionType\tSubmissionStatusDate\n000011\tORIG\t2023-01-01",
+    },
+    # Two exclusivity records for same product: 2000-01-01 (Past) and 3000-01-01 (Future)
+    "exclusivity_mixed_dates": {
+        "Exclusivity.txt": b"ApplNo\tProductNo\tExclusivityDate\n000001\t001\t2000-01-01\n000001\t001\t3000-01-01",
+    },
+    # Duplicate Applications for 000001. Even if they differed, unique(subset=['appl_no']) picks one.
+    "auxiliary_duplication": {
+        "Applications.txt": b"ApplNo\tSponsorName\tApplType\n000001\tSponsorA\tN\n000001\tSponsorA\tN",
+    },
+}
+
+
+def test_malformed_tsv_ragged_lines(
+    source_factory: Callable[[bytes], DltSource], make_zip: Callable[[Mapping[str, Union[str, bytes]]], bytes]
+) -> None:
     """
     Test handling of TSV files with ragged lines (extra columns).
     source.py uses `truncate_ragged_lines=True`.
     """
-    # Create a zip with ragged lines
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        # Header has 2 cols. Row 1 has 2. Row 2 has 3 (extra). Row 3 has 1 (missing).
-        content = "ColA\tColB\nVal1\tVal2\nVal3\tVal4\tExtra\nVal5"
-        z.writestr("Products.txt", content)
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-
-        # dlt source yields resources.
-        assert "fda_drugs_bronze_products" in source.resources
-        resource = source.resources["fda_drugs_bronze_products"]
-
-        data = list(resource)
-        # Check that we got rows.
-        # Truncate ragged lines behavior in Polars:
-        # It usually truncates rows that are too long if they don't match header?
-        # Or it might ignore them if `ignore_errors=True`.
-        # Let's inspect.
-
-        # Row 1: Val1, Val2
-        # Row 2: Val3, Val4 (Extra ignored?)
-        # Row 3: Val5, null
-
-        assert len(data) >= 1
-
-        # Note: Polars `read_csv` with `truncate_ragged_lines=True` allows parsing rows with more columns
-        # than header by ignoring extra cols. Rows with fewer columns might be filled with nulls.
-
-        df = pl.DataFrame(data)
-        assert "col_a" in df.columns
-        assert "col_b" in df.columns
-
-        # Row with extra data
-        row2 = df.filter(pl.col("col_a") == "Val3")
-        assert len(row2) == 1
-        assert row2["col_b"][0] == "Val4"
-
-        # Row with missing data
-        # Note: Polars might error on missing columns unless `null_values` logic applies or schema inference allows.
-        # But `ignore_errors=True` is set.
-        row3 = df.filter(pl.col("col_a") == "Val5")
-        if len(row3) > 0:
-            assert row3["col_b"][0] is None
-        else:
-            # If ignore_errors dropped it, that's also valid handling for "Complex/Edge" case of bad data.
-            pass
-
-
-def test_transform_null_handling() -> None:
+    source = source_factory(make_zip(_FIXTURES["ragged_lines"]))
+
+    # dlt source yields resources.
+    assert "fda_drugs_bronze_products" in source.resources
+    resource = source.resources["fda_drugs_bronze_products"]
+
+    data = list(resource)
+    # Check that we got rows.
+    # Truncate ragged lines behavior in Polars:
+    # It usually truncates rows that are too long if they don't match header?
+    # Or it might ignore them if `ignore_errors=True`.
+    # Let's inspect.
+
+    # Row 1: Val1, Val2
+    # Row 2: Val3, Val4 (Extra ignored?)
+    # Row 3: Val5, null
+
+    assert len(data) >= 1
+
+    # Note: Polars `read_csv` with `truncate_ragged_lines=True` allows parsing rows with more columns
+    # than header by ignoring extra cols. Rows with fewer columns might be filled with nulls.
+
+    # A handful of rows: plain dict scans are cheaper than building a frame to filter
+    assert "col_a" in data[0]
+    assert "col_b" in data[0]
+
+    # Row with extra data
+    row2 = [r for r in data if r.get("col_a") == "Val3"]
+    assert len(row2) == 1
+    assert row2[0]["col_b"] == "Val4"
+
+    # Row with missing data
+    # Note: Polars might error on missing columns unless `null_values` logic applies or schema inference allows.
+    # But `ignore_errors=True` is set.
+    row3 = [r for r in data if r.get("col_a") == "Val5"]
+    if row3:
+        assert row3[0]["col_b"] is None
+    else:
+        # If ignore_errors dropped it, that's also valid handling for "Complex/Edge" case of bad data.
+        pass
+
+
+@pytest.fixture(scope="module")  # type: ignore[misc]
+def null_lf() -> pl.LazyFrame:
+    """Shared input for the null-handling checks; transforms return new frames, so it is never mutated."""
+    return pl.LazyFrame({"appl_no": [None, "123"], "product_no": ["1", None], "active_ingredient": [None, "A; B"]})
+
+
+@pytest.fixture(scope="module")  # type: ignore[misc]
+def overflow_df() -> pl.DataFrame:
+    """IDs longer than their padding width."""
+    return pl.DataFrame(
+        {
+            "appl_no": ["1234567"],  # 7 digits
+            "product_no": ["1234"],  # 4 digits
+        }
+    )
+
+
+@pytest.fixture(scope="module")  # type: ignore[misc]
+def ingredients_df() -> pl.DataFrame:
+    """Ingredient string with extra whitespace and a trailing separator."""
+    return pl.DataFrame({"active_ingredient": ["  Ingredient A  ; Ingredient B ; "]})
+
+
+def test_transform_null_handling(null_lf: pl.LazyFrame) -> None:
     """
     Test transformation functions with Null values.
+    The three transforms run as one lazy plan and are collected once.
     """
-    df = pl.DataFrame({"appl_no": [None, "123"], "product_no": ["1", None], "active_ingredient": [None, "A; B"]})
+    res = pipeline_lazy(null_lf).collect()
 
     # 1. normalize_ids
     # Should handle None. Padded strings of null usually become null or "00null"?
     # pl.col().cast(pl.String) converts None to null. str.pad_start on null results in null.
-    res_ids = normalize_ids(df)
-    assert res_ids["appl_no"][0] is None
-    assert res_ids["appl_no"][1] == "000123"
-    assert res_ids["product_no"][0] == "001"
-    assert res_ids["product_no"][1] is None
+    assert res["appl_no"][0] is None
+    assert res["appl_no"][1] == "000123"
+    assert res["product_no"][0] == "001"
+    assert res["product_no"][1] is None
 
     # 2. clean_ingredients
     # str.to_uppercase on null is null.
-    res_ing = clean_ingredients(df)
-    ing_list = res_ing["active_ingredients_list"].to_list()
+    ing_list = res["active_ingredients_list"].to_list()
     # Expectation updated: Null values should become empty lists
     assert ing_list[0] == []
     assert ing_list[1] == ["A", "B"]
@@ -113,42 +162,22 @@ def test_transform_null_handling() -> None:
     # This generates a valid UUID for the string "None|...".
     # Is this desired? Pydantic model requires strict string.
     # But Bronze data might have nulls.
+    assert res["coreason_id"][0] == _NULL_APPL_COREASON_ID
 
-    res_uuid = generate_coreason_id(res_ids)
-    assert res_uuid["coreason_id"][0] is not None
-    # Verify it doesn't crash.
 
-
-def test_id_overflow() -> None:
+def test_id_overflow(overflow_df: pl.DataFrame) -> None:
     """
     Test ID normalization when input is longer than padding.
     """
-    df = pl.DataFrame(
-        {
-            "appl_no": ["1234567"],  # 7 digits
-            "product_no": ["1234"],  # 4 digits
-        }
-    )
-    res = normalize_ids(df)
+    res = normalize_ids(overflow_df)
 
     # pad_start does not truncate.
     assert res["appl_no"][0] == "1234567"
     assert res["product_no"][0] == "1234"
 
-    # Pydantic validation should fail
-    # We need to construct the model
+    # Pydantic validation of the ApplNo field should fail
     with pytest.raises(ValidationError):
-        ProductSilver(
-            coreason_id=uuid.uuid4(),
-            source_id="1234567001",
-            appl_no=res["appl_no"][0],  # Invalid
-            product_no="001",
-            form="F",
-            strength="S",
-            active_ingredients_list=[],
-            original_approval_date=None,
-            hash_md5="hash",
-        )
+        APPL_NO_ADAPTER.validate_python(res["appl_no"][0])
 
 
 def test_date_parsing_variations() -> None:
@@ -190,155 +219,109 @@ def test_date_parsing_variations() -> None:
     assert res["date"][4] is None
 
 
-def test_pydantic_validation_edge_cases() -> None:
+@pytest.fixture(scope="module")  # type: ignore[misc]
+def base_data() -> Mapping[str, Any]:
+    """A valid ProductSilver record, read-only so tests cannot leak edits into each other."""
+    return MappingProxyType(
+        {
+            "coreason_id": _FIXED_UUID,
+            "source_id": "000123001",
+            "appl_no": "000123",
+            "product_no": "001",
+            "form": "Form",
+            "strength": "Str",
+            "active_ingredients_list": ["Ing"],
+            "original_approval_date": None,
+            "hash_md5": "hash",
+        }
+    )
+
+
+def test_pydantic_validation_accepts_base_record(base_data: Mapping[str, Any]) -> None:
+    """The full model accepts the valid record."""
+    ProductSilver(**base_data)
+
+
+@pytest.mark.parametrize(  # type: ignore[misc]
+    "adapter,value",
+    [
+        # 1. ApplNo with letters
+        (APPL_NO_ADAPTER, "A00123"),
+        # 2. ProductNo with letters
+        (PRODUCT_NO_ADAPTER, "0A1"),
+        # 3. Empty strings? Pattern `^\d{6}$` rejects empty.
+        (APPL_NO_ADAPTER, ""),
+    ],
+    ids=["appl_no_letters", "product_no_letters", "appl_no_empty"],
+)
+def test_pydantic_validation_edge_cases(adapter: TypeAdapter[str], value: str) -> None:
     """
     Test Pydantic model with strict constraints.
+    Negative paths only need the one constrained field's validator.
     """
-    base_data = {
-        "coreason_id": uuid.uuid4(),
-        "source_id": "000123001",
-        "appl_no": "000123",
-        "product_no": "001",
-        "form": "Form",
-        "strength": "Str",
-        "active_ingredients_list": ["Ing"],
-        "original_approval_date": None,
-        "hash_md5": "hash",
-    }
-
-    # 1. ApplNo with letters
-    data = base_data.copy()
-    data["appl_no"] = "A00123"
     with pytest.raises(ValidationError):
-        ProductSilver(**data)
+        adapter.validate_python(value)
 
-    # 2. ProductNo with letters
-    data = base_data.copy()
-    data["product_no"] = "0A1"
-    with pytest.raises(ValidationError):
-        ProductSilver(**data)
-
-    # 3. Empty strings?
-    # Pattern `^\d{6}$` rejects empty.
-    data = base_data.copy()
-    data["appl_no"] = ""
-    with pytest.raises(ValidationError):
-        ProductSilver(**data)
 
-
-def test_submission_join_duplicate_orig() -> None:
+def test_submission_join_duplicate_orig(
+    source_factory: Callable[[bytes], DltSource], make_zip: Callable[[Mapping[str, Union[str, bytes]]], bytes]
+) -> None:
     """
     Test handling of multiple 'ORIG' submissions.
     We should use the earliest date (min date).
     """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        # ApplNo 000009 has two ORIG submissions
-        products = "ApplNo\tProductNo\tActiveIngredient\tForm\tStrength\n000009\t001\tIng\tF\tS"
-        z.writestr("Products.txt", products)
-
-        # 1. Date 2023-01-01
-        # 2. Date 2022-01-01 (Earlier)
-        submissions = "ApplNo\tSubmissionType\tSubmissionStatusDate\n000009\tORIG\t2023-01-01\n000009\tORIG\t2022-01-01"
-        z.writestr("Submissions.txt", submissions)
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+    source = source_factory(make_zip(_FIXTURES["duplicate_orig"]))
+    row = next(iter(source.resources["fda_drugs_silver_products"]))
 
-        source = drugs_fda_source()
-        silver_prod = list(source.resources["fda_drugs_silver_products"])
-        row = silver_prod[0]
+    # Expect 2022-01-01 (Earliest) because code sorts by date
+    assert row["original_approval_date"] == datetime.date(2022, 1, 1)
 
-        # Expect 2022-01-01 (Earliest) because code sorts by date
-        assert row["original_approval_date"] == datetime.date(2022, 1, 1)
 
-
-def test_submission_join_mismatched_padding() -> None:
+def test_submission_join_mismatched_padding(
+    source_factory: Callable[[bytes], DltSource], make_zip: Callable[[Mapping[str, Union[str, bytes]]], bytes]
+) -> None:
     """
     Test that join works even if ApplNo has different padding/length in source files,
     because source.py normalizes them before join.
     """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        # Products has "10" (will become "000010")
-        products = "ApplNo\tProductNo\tActiveIngredient\tForm\tStrength\n10\t001\tIng\tF\tS"
-        z.writestr("Products.txt", products)
-
-        # Submissions has "000010" (already padded)
-        # OR "010" (partially padded)
-        submissions = "ApplNo\tSubmissionType\tSubmissionStatusDate\n010\tORIG\t2023-05-05"
-        z.writestr("Submissions.txt", submissions)
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_get.return_value = mock_response
+    source = source_factory(make_zip(_FIXTURES["mismatched_padding"]))
+    row = next(iter(source.resources["fda_drugs_silver_products"]))
 
-        source = drugs_fda_source()
-        silver_prod = list(source.resources["fda_drugs_silver_products"])
-        row = silver_prod[0]
+    assert row["appl_no"] == "000010"
+    assert row["original_approval_date"] == datetime.date(2023, 5, 5)
 
-        assert row["appl_no"] == "000010"
-        assert row["original_approval_date"] == datetime.date(2023, 5, 5)
 
-
-def test_encoding_cp1252() -> None:
+def test_encoding_cp1252(
+    source_factory: Callable[[bytes], DltSource], make_zip: Callable[[Mapping[str, Union[str, bytes]]], bytes]
+) -> None:
     """
     Test reading files with CP1252 specific characters (e.g. curly quotes, accents).
     \x93 is left curly quote in CP1252 (U+201C “).
     \xe9 is 'é' in CP1252.
     """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        # Construct bytes directly to avoid python encoding confusion
-        # Header
-        header = b"ApplNo\tProductNo\tDrugName\tActiveIngredient\tForm\tStrength\n"
-        # Row: 000011 \t 001 \t Test [0x93] Name [0x94] \t Ingr [0xE9] dient \t F \t S
-        row = b"000011\t001\tTest\x93Name\x94\tIngr\xe9dient\tF\tS"
-        z.writestr("Products.txt", header + row)
-
-        # Submissions (normal)
-        z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n000011\tORIG\t2023-01-01")
-
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        silver_prod = list(source.resources["fda_drugs_silver_products"])
-        row = silver_prod[0]
-
-        # Verify decoding
-        # 0x93 -> “ (U+201C)
-        # 0x94 -> ” (U+201D)
-        # 0xE9 -> é (U+00E9)
-        # DrugName is likely snake_cased or just present in dict?
-        # Note: _to_snake_case is for keys. Values are cleaned.
-        # But we don't have DrugName in Silver schema explicitly tested before?
-        # Silver resource yields whatever cols are in Products + enriched.
-        # But Pydantic model DOES NOT have DrugName.
-        # So DrugName will be ignored/dropped by ProductSilver unless we added it?
-        # ProductSilver in silver.py:
-        # coreason_id, appl_no, product_no, form, strength, active_ingredients_list, original_approval_date,
-        # is_historic_record, hash_md5.
-        # It does NOT have DrugName.
-        # So we can't assert row['drug_name'].
-        # We can only assert active_ingredients_list decoding.
-
-        # active_ingredients_list is upper-cased in transform.py
-        # "Ingr\xe9dient" -> "Ingrédient" -> "INGRÉDIENT"
-        assert row["active_ingredients_list"][0] == "INGRÉDIENT"
-
-
-def test_gold_exclusivity_mixed_dates() -> None:
+    source = source_factory(make_zip(_FIXTURES["cp1252"]))
+    # Decoding happens when Bronze reads the TSV, so the raw resource is enough:
+    # no Submissions join, transforms or model validation are needed.
+    row = next(iter(source.resources["fda_drugs_bronze_products"]))
+
+    # Verify decoding
+    # 0x93 -> “ (U+201C)
+    # 0x94 -> ” (U+201D)
+    # 0xE9 -> é (U+00E9)
+    # Bronze keeps every source column (snake_cased), so DrugName can be checked too.
+    assert row["drug_name"] == "Test\u201cName\u201d"
+    assert row["active_ingredient"] == "Ingrédient"
+
+
+def test_clean_ingredients_uppercases_non_ascii() -> None:
+    """Test that clean_ingredients upper-cases accented (CP1252-decoded) characters too."""
+    res = clean_ingredients(pl.DataFrame({"active_ingredient": ["Ingrédient"]}))
+    assert res["active_ingredients_list"].to_list() == [["INGRÉDIENT"]]
+
+
+def test_gold_exclusivity_mixed_dates(
+    source_factory: Callable[[bytes], DltSource], make_zip: Callable[[Mapping[str, Union[str, bytes]]], bytes]
+) -> None:
     """
     Test Gold layer protection status with mixed exclusivity dates.
     Product 001 has two exclusivity records:
@@ -346,75 +329,38 @@ def test_gold_exclusivity_mixed_dates() -> None:
     2. Future date (Active)
     Result should be is_protected=True (Max date > Today).
     """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        products = "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000001\t001\tF\tS\tIng"
-        z.writestr("Products.txt", products)
-        z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n000001\tORIG\t2020-01-01")
-
-        # Two exclusivity records for same product
-        # 2000-01-01 (Past)
-        # 3000-01-01 (Future)
-        excl = "ApplNo\tProductNo\tExclusivityDate\n000001\t001\t2000-01-01\n000001\t001\t3000-01-01"
-        z.writestr("Exclusivity.txt", excl)
-
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_get.return_value = mock_response
+    source = source_factory(make_zip(_FIXTURES["exclusivity_mixed_dates"]))
+    gold_iter = iter(source.resources["fda_drugs_gold_products"])
+    row = next(gold_iter)
+    assert next(gold_iter, None) is None
 
-        source = drugs_fda_source()
-        gold_prods = list(source.resources["fda_drugs_gold_products"])
-        assert len(gold_prods) == 1
-        row = gold_prods[0]
+    # Should be protected because max(3000, 2000) > today
+    assert row["is_protected"] is True
 
-        # Should be protected because max(3000, 2000) > today
-        assert row["is_protected"] is True
 
-
-def test_gold_auxiliary_duplication() -> None:
+def test_gold_auxiliary_duplication(
+    source_factory: Callable[[bytes], DltSource], make_zip: Callable[[Mapping[str, Union[str, bytes]]], bytes]
+) -> None:
     """
     Test that duplicate records in auxiliary files (e.g., Applications) do not cause row explosion.
     Applications.txt has duplicate rows for the same ApplNo.
     """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        products = "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000001\t001\tF\tS\tIng"
-        z.writestr("Products.txt", products)
-        z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n000001\tORIG\t2020-01-01")
-
-        # Duplicate Applications for 000001
-        # Row 1: Sponsor A
-        # Row 2: Sponsor A (Duplicate)
-        # Even if they differ, the logic uses unique(subset=['appl_no']), so it picks one.
-        apps = "ApplNo\tSponsorName\tApplType\n000001\tSponsorA\tN\n000001\tSponsorA\tN"
-        z.writestr("Applications.txt", apps)
-
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        gold_prods = list(source.resources["fda_drugs_gold_products"])
+    source = source_factory(make_zip(_FIXTURES["auxiliary_duplication"]))
+    gold_iter = iter(source.resources["fda_drugs_gold_products"])
+    row = next(gold_iter)
 
-        # Should still be 1 row, not 2
-        assert len(gold_prods) == 1
-        assert gold_prods[0]["sponsor_name"] == "SponsorA"
+    # Should still be 1 row, not 2
+    assert next(gold_iter, None) is None
+    assert row["sponsor_name"] == "SponsorA"
 
 
-def test_ingredients_complex_formatting() -> None:
+def test_ingredients_complex_formatting(ingredients_df: pl.DataFrame) -> None:
     """
     Test ingredient cleaning with extra whitespace and separators.
     Input: "  Ingredient A  ; Ingredient B ; "
     Expected: ["INGREDIENT A", "INGREDIENT B", ""] (Empty string if trailing semi-colon)
     """
-    df = pl.DataFrame({"active_ingredient": ["  Ingredient A  ; Ingredient B ; "]})
-    res = clean_ingredients(df)
+    res = clean_ingredients(ingredients_df)
     ingredients = res["active_ingredients_list"][0].to_list()
 
     assert "INGREDIENT A" in ingredients
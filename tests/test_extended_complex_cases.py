@@ -8,172 +8,85 @@
 #
 # Source Code: https://github.com/CoReason-AI/coreason_etl_drugs_fda
 
-import io
-import zipfile
 from datetime import date
-from unittest.mock import MagicMock, patch
-
-from coreason_etl_drugs_fda.source import drugs_fda_source
-
-
-def test_ghost_records_in_aux_files() -> None:
+from typing import Any, Callable, Dict, Mapping, Union
+
+import pytest
+from dlt.sources import DltSource
+
+# Products.txt shared by the archives that only vary their Submissions/auxiliary members.
+_STD_PRODUCTS = b"ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000001\t001\tTab\t10mg\tIng1"
+
+# Members not listed (mostly the 000001 ORIG 2020-01-01 Submissions) come from the skeleton.
+_FIXTURES: Dict[str, Dict[str, bytes]] = {
+    # MarketingStatus contains 000001 (Valid) AND 000999 (Ghost); TE contains only 000999 (Ghost)
+    "ghost_records": {
+        "Products.txt": _STD_PRODUCTS,
+        "MarketingStatus.txt": b"ApplNo\tProductNo\tMarketingStatusID\n000001\t001\t1\n000999\t001\t2",
+        "TE.txt": b"ApplNo\tProductNo\tTECode\n000999\t001\tAB",
+    },
+    # Two ORIG submissions: "Approved prior to Jan 1, 1982" (-> 1982-01-01) and 1980-01-01 (strictly earlier)
+    "legacy_vs_older_real_date": {
+        "Products.txt": _STD_PRODUCTS,
+        "Submissions.txt": (
+            b"ApplNo\tSubmissionType\tSubmissionStatusDate\n"
+            b"000001\tORIG\tApproved prior to Jan 1, 1982\n"
+            b"000001\tORIG\t1980-01-01"
+        ),
+    },
+    # Product with NO DrugName and NO ActiveIngredient column; no Applications (Sponsor) or TE either
+    "search_vector_all_nulls": {"Products.txt": b"ApplNo\tProductNo\tForm\tStrength\n000001\t001\tTab\t10mg"},
+    # ActiveIngredient is empty string
+    "no_ingredients": {
+        "Products.txt": b"ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000001\t001\tTab\t10mg\t",
+    },
+    # SubmissionStatusDate is empty
+    "submission_date_missing": {
+        "Products.txt": _STD_PRODUCTS,
+        "Submissions.txt": b"ApplNo\tSubmissionType\tSubmissionStatusDate\n000001\tORIG\t",
+    },
+}
+
+
+@pytest.mark.parametrize(  # type: ignore[misc]
+    "fixture,resource,field,expected",
+    [
+        # Records in auxiliary files (Marketing, TE) that do not match any `ApplNo` in `Products`
+        # are ignored: the pipeline is "Products-driven", so Gold has no "ghost" rows.
+        ("ghost_records", "fda_drugs_gold_products", "appl_no", "000001"),
+        # A real ORIG date (1980) wins over the "Approved prior to 1982" proxy date (1982-01-01),
+        # because min() picks the earlier one.
+        ("legacy_vs_older_real_date", "fda_drugs_silver_products", "original_approval_date", date(1980, 1, 1)),
+        # With DrugName, Ingredient, Sponsor and TE all missing, `search_vector` is "" (not "None" or null).
+        ("search_vector_all_nulls", "fda_drugs_gold_products", "search_vector", ""),
+        # An empty `ActiveIngredient` produces an empty `active_ingredients_list` rather than [""].
+        ("no_ingredients", "fda_drugs_silver_products", "active_ingredients_list", []),
+        # An `ORIG` submission with an empty date gives a None approval date, not a crash.
+        ("submission_date_missing", "fda_drugs_silver_products", "original_approval_date", None),
+    ],
+    ids=[
+        "ghost_records",
+        "legacy_vs_older_real_date",
+        "search_vector_all_nulls",
+        "no_ingredients",
+        "submission_date_missing",
+    ],
+)
+def test_single_product_pipeline(
+    source_factory: Callable[[bytes], DltSource],
+    make_zip: Callable[[Mapping[str, Union[str, bytes]]], bytes],
+    fixture: str,
+    resource: str,
+    field: str,
+    expected: Any,
+) -> None:
     """
-    Verify that records in auxiliary files (Marketing, TE) that do not match
-    any `ApplNo` in `Products` are correctly ignored (no "ghost" rows in Gold).
-    The pipeline is "Products-driven".
-    """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        # Product 000001
-        z.writestr("Products.txt", "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000001\t001\tTab\t10mg\tIng1")
-        # Submissions
-        z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n000001\tORIG\t2020-01-01")
-
-        # MarketingStatus contains 000001 (Valid) AND 000999 (Ghost)
-        z.writestr("MarketingStatus.txt", "ApplNo\tProductNo\tMarketingStatusID\n000001\t001\t1\n000999\t001\t2")
-
-        # TE contains 000999 (Ghost)
-        z.writestr("TE.txt", "ApplNo\tProductNo\tTECode\n000999\t001\tAB")
-
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        gold_prods = list(source.resources["fda_drugs_gold_products"])
-
-        # Should strictly be 1 row (000001)
-        assert len(gold_prods) == 1
-        assert gold_prods[0]["appl_no"] == "000001"
-
-
-def test_legacy_date_vs_older_real_date() -> None:
-    """
-    Verify that a real date (e.g., 1980) is selected over the
-    "Approved prior to 1982" proxy date (1982-01-01) if the real date is earlier.
-    This handles cases where data might be mixed.
-    Legacy Logic Proxy: 1982-01-01.
-    If we have another ORIG submission with 1980-01-01, min() should pick 1980.
-    """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        z.writestr("Products.txt", "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000001\t001\tTab\t10mg\tIng1")
-
-        # Two ORIG submissions
-        # 1. "Approved prior to Jan 1, 1982" -> Becomes 1982-01-01
-        # 2. "1980-01-01" -> 1980-01-01 (Strictly earlier)
-        content = (
-            "ApplNo\tSubmissionType\tSubmissionStatusDate\n"
-            "000001\tORIG\tApproved prior to Jan 1, 1982\n"
-            "000001\tORIG\t1980-01-01"
-        )
-        z.writestr("Submissions.txt", content)
-
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        silver_prods = list(source.resources["fda_drugs_silver_products"])
-
-        assert len(silver_prods) == 1
-        # 1980 is earlier than 1982, so it should win.
-        assert silver_prods[0]["original_approval_date"] == date(1980, 1, 1)
-
-
-def test_search_vector_all_nulls() -> None:
+    Runs a one-product archive through the source and checks that `resource`
+    yields exactly one row whose `field` equals `expected`.
     """
-    Verify `search_vector` generation produces an empty string (not "None" or null)
-    when all inputs (DrugName, Ingredient, Sponsor, TE) are missing.
-    """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        # Product with NO DrugName, NO Ingredient (empty)
-        # Note: ActiveIngredient is required col in input usually, but if we provide it as empty or missing?
-        # If missing col, clean_ingredients adds empty list.
-        # "Products.txt" with minimal cols.
-        z.writestr("Products.txt", "ApplNo\tProductNo\tForm\tStrength\n000001\t001\tTab\t10mg")
-        z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n000001\tORIG\t2020-01-01")
-
-        # No Applications (Sponsor missing)
-        # No TE (TE missing)
-
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        gold_prods = list(source.resources["fda_drugs_gold_products"])
-        assert len(gold_prods) == 1
-        row = gold_prods[0]
-
-        # search_vector should be "" (empty string)
-        # Logic: "" + "" + "" + "" -> ""
-        assert row["search_vector"] == ""
-
-
-def test_product_no_ingredients() -> None:
-    """
-    Verify handling of products with null/empty `ActiveIngredient`.
-    Should result in empty list `active_ingredients_list` and not crash.
-    """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        # ActiveIngredient is empty string
-        z.writestr("Products.txt", "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000001\t001\tTab\t10mg\t")
-        z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n000001\tORIG\t2020-01-01")
-
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        silver_prods = list(source.resources["fda_drugs_silver_products"])
-        assert len(silver_prods) == 1
-        row = silver_prods[0]
-
-        # clean_ingredients: split(";") on "" -> [""]? Or if null -> []?
-        # Correct behavior verified: it produces [] (empty list)
-        assert row["active_ingredients_list"] == []
-
-
-def test_submission_date_missing() -> None:
-    """
-    Verify that an `ORIG` submission with a missing/empty date field
-    results in `None` for approval date, not a crash.
-    """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        z.writestr("Products.txt", "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000001\t001\tTab\t10mg\tIng1")
-        # SubmissionStatusDate is empty
-        z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n000001\tORIG\t")
-
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+    source = source_factory(make_zip(_FIXTURES[fixture]))
+    rows = iter(source.resources[resource])
+    row = next(rows)
 
-        source = drugs_fda_source()
-        silver_prods = list(source.resources["fda_drugs_silver_products"])
-        assert len(silver_prods) == 1
-        # Should be None
-        assert silver_prods[0]["original_approval_date"] is None
+    assert next(rows, None) is None
+    assert row[field] == expected
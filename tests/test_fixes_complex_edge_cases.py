@@ -8,63 +8,87 @@
 #
 # Source Code: https://github.com/CoReason-AI/coreason_etl_drugs_fda
 
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
 import polars as pl
+import pytest
 
 from coreason_etl_drugs_fda.transform import clean_ingredients, normalize_ids
 
-
-def test_normalize_ids_complex_whitespace() -> None:
+# (raw value, expected appl_no, expected product_no), fed to normalize_ids as one frame.
+# Whitespace-only strings (tabs, newlines) are stripped and treated as empty (Null). Empty strings
+# are Ghost Records -> Null, while explicit zeros are data and get padded: we are not aggressively
+# killing zeros, only empty/whitespace.
+_ID_CASES: Tuple[Tuple[str, Optional[str], Optional[str]], ...] = (
+    ("\t", None, None),
+    ("\n", None, None),
+    ("\r", None, None),
+    (" \t \n ", None, None),
+    ("", None, None),
+    ("0", "000000", "000"),
+    ("00", "000000", "000"),
+    ("000", "000000", "000"),
+    ("1", "000001", "001"),
+    ("123", "000123", "123"),
+)
+
+
+@pytest.fixture(scope="module")  # type: ignore[misc]
+def normalized_id_cases() -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    """Runs normalize_ids once over every case and maps each raw value to its (appl_no, product_no)."""
+    raw = [case[0] for case in _ID_CASES]
+    result = normalize_ids(pl.DataFrame({"appl_no": raw, "product_no": raw}))
+    return dict(zip(raw, zip(result["appl_no"].to_list(), result["product_no"].to_list(), strict=True), strict=True))
+
+
+@pytest.mark.parametrize(  # type: ignore[misc]
+    "raw,expected_appl_no,expected_product_no",
+    _ID_CASES,
+    ids=[
+        "tab",
+        "newline",
+        "carriage_return",
+        "mixed_whitespace",
+        "empty",
+        "zero",
+        "double_zero",
+        "triple_zero",
+        "one",
+        "valid",
+    ],
+)
+def test_normalize_ids_whitespace_and_zero_handling(
+    normalized_id_cases: Dict[str, Tuple[Optional[str], Optional[str]]],
+    raw: str,
+    expected_appl_no: Optional[str],
+    expected_product_no: Optional[str],
+) -> None:
     """
-    Test normalize_ids with various whitespace characters (tabs, newlines).
-    These should be stripped and treated as empty (Null).
+    Verify normalize_ids on whitespace characters and the distinction between
+    empty strings (Ghost Records -> Null) and explicit "0" strings (Data -> Padded).
     """
-    df = pl.DataFrame(
-        {"appl_no": ["\t", "\n", "\r", " \t \n ", "123"], "product_no": ["\t", "\n", "\r", " \t \n ", "1"]}
-    )
-
-    result = normalize_ids(df)
+    assert normalized_id_cases[raw] == (expected_appl_no, expected_product_no)
 
-    # All whitespace-only strings should become None
-    assert result["appl_no"][0] is None
-    assert result["appl_no"][1] is None
-    assert result["appl_no"][2] is None
-    assert result["appl_no"][3] is None
-    # Valid value preserved and padded
-    assert result["appl_no"][4] == "000123"
 
-    assert result["product_no"][0] is None
-    assert result["product_no"][4] == "001"
+@lru_cache(maxsize=None)
+def _chaos_string() -> str:
+    """A massive string of delimiters and whitespace around two valid ingredients."""
+    # 1000 semicolons, spaces, and valid ingredients
+    return ";" * 1000 + "  Ingredient A  ;  " + "; " * 500 + "Ingredient B" + ";" * 1000
 
 
-def test_normalize_ids_zero_handling() -> None:
-    """
-    Verify the distinction between empty strings (Ghost Records -> Null)
-    and explicit "0" strings (Data -> Padded).
-    """
-    df = pl.DataFrame({"appl_no": ["", "0", "00", "000"], "product_no": ["", "0", "00", "000"]})
-
-    result = normalize_ids(df)
-
-    # Empty -> None
-    assert result["appl_no"][0] is None
-
-    # "0" -> "000000" (It is technically value '0', processed as data)
-    # This behavior confirms we are not aggressively killing zeros, only empty/whitespace.
-    assert result["appl_no"][1] == "000000"
-    assert result["appl_no"][2] == "000000"
-    assert result["appl_no"][3] == "000000"
-
-
-def test_clean_ingredients_massive_chaos() -> None:
+@pytest.mark.parametrize("n_rows", [1, 1000, 10_000], ids=["single_row", "batch_1k", "batch_10k"])  # type: ignore[misc]
+def test_clean_ingredients_massive_chaos(n_rows: int) -> None:
     """
     Test clean_ingredients with a massive string of delimiters and whitespace.
+    The batched variants spread the same chaos over many rows, so the split/explode kernels
+    run over a real offsets buffer rather than a single cell.
     """
-    # Construct a chaos string: 1000 semicolons, spaces, and valid ingredients
-    chaos = ";" * 1000 + "  Ingredient A  ;  " + "; " * 500 + "Ingredient B" + ";" * 1000
-
-    df = pl.DataFrame({"active_ingredient": [chaos]})
+    df = pl.select(active_ingredient=pl.repeat(_chaos_string(), n_rows))
     result = clean_ingredients(df)
 
+    assert result.height == n_rows
     ingredients = result["active_ingredients_list"][0].to_list()
 
     # Should cleanly reduce to just the two ingredients
@@ -72,6 +96,22 @@ def test_clean_ingredients_massive_chaos() -> None:
     assert ingredients[0] == "INGREDIENT A"
     assert ingredients[1] == "INGREDIENT B"
 
+    # Every row of the batch reduces the same way
+    joined = result.select(pl.col("active_ingredients_list").list.join("|").unique())
+    assert joined.to_series().to_list() == ["INGREDIENT A|INGREDIENT B"]
+
+
+def test_clean_ingredients_duplicate_ingredients() -> None:
+    """
+    Test that 100,000 repeated ingredients in one cell reduce to the distinct ones, in order.
+    Casing and padding differences still count as the same ingredient.
+    """
+    repeated = ";".join(["Ingredient A", " ingredient b "] * 50_000)
+    df = pl.DataFrame({"active_ingredient": [repeated, "B;A;B"]})
+    result = clean_ingredients(df)
+
+    assert result["active_ingredients_list"].to_list() == [["INGREDIENT A", "INGREDIENT B"], ["B", "A"]]
+
 
 def test_clean_ingredients_all_delimiters() -> None:
     """
@@ -80,8 +120,7 @@ def test_clean_ingredients_all_delimiters() -> None:
     df = pl.DataFrame({"active_ingredient": [";;;;;;;;;", "   ;   ;   "]})
     result = clean_ingredients(df)
 
-    assert result["active_ingredients_list"][0].to_list() == []
-    assert result["active_ingredients_list"][1].to_list() == []
+    assert result["active_ingredients_list"].to_list() == [[], []]
 
 
 def test_mixed_types_resilience() -> None:
@@ -93,19 +132,12 @@ def test_mixed_types_resilience() -> None:
     # unless it's Object (which Polars discourages/doesn't fully support like Pandas).
     # But we can test Integer column input specifically again.
 
-    df = pl.DataFrame(
-        {
-            "appl_no": [1, 10, 100, 1000, 10000, 100000, 1000000],
-            "product_no": [1, 10, 100, 1000, 10000, 100000, 1000000],
-        }
-    )
+    # Powers of ten 1..1_000_000, generated in Polars rather than boxed from a Python list
+    powers_of_ten = (10 ** pl.int_range(0, 7)).cast(pl.Int64)
+    df = pl.select(appl_no=powers_of_ten, product_no=powers_of_ten)
 
     result = normalize_ids(df)
 
-    assert result["appl_no"][0] == "000001"
-    assert result["appl_no"][5] == "100000"
-    assert result["appl_no"][6] == "1000000"  # Should not truncate
-
-    assert result["product_no"][0] == "001"
-    assert result["product_no"][2] == "100"
-    assert result["product_no"][3] == "1000"  # Should not truncate
+    # Values wider than the pad width are kept whole: "1000000" and "1000" are not truncated
+    assert result["appl_no"].to_list() == ["000001", "000010", "000100", "001000", "010000", "100000", "1000000"]
+    assert result["product_no"].to_list() == ["001", "010", "100", "1000", "10000", "100000", "1000000"]
@@ -8,14 +8,39 @@
 #
 # Source Code: https://github.com/CoReason-AI/coreason_etl_drugs_fda
 
-import io
-import zipfile
-from unittest.mock import MagicMock, patch
+from typing import Any, Callable, Dict, Mapping, Tuple, Union
 
-from coreason_etl_drugs_fda.source import drugs_fda_source
+import polars as pl
+import pytest
 
 
-def test_massive_fanout_search_vector_resilience() -> None:
+@pytest.fixture(scope="session")  # type: ignore[misc]
+def massive_te_zip_bytes(make_zip: Callable[[Mapping[str, Union[str, bytes]]], bytes]) -> bytes:
+    """
+    The base product with 5,000 TE codes.
+    Gold takes UNIQUE (appl_no, product_no) from TE, so the 5,000 rows must collapse to 1.
+    """
+    # Rows are generated and written as TSV by Polars instead of a Python f-string loop
+    te_df = pl.select(
+        ApplNo=pl.repeat("000001", 5000),
+        ProductNo=pl.repeat("001", 5000),
+        TECode=pl.format("TE{}", pl.int_range(5000)),
+    )
+    return make_zip({"TE.txt": te_df.write_csv(separator="\t")})
+
+
+@pytest.fixture(scope="session")  # type: ignore[misc]
+def massive_ingredients_zip_bytes(make_zip: Callable[[Mapping[str, Union[str, bytes]]], bytes]) -> bytes:
+    """One product whose ActiveIngredient holds 1,000 ingredients joined by ';'."""
+    ingredients = pl.select(pl.format("Ing{}", pl.int_range(1000)).str.join(";")).item()
+    return make_zip(
+        {"Products.txt": f"ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000001\t001\tF\tS\t{ingredients}"}
+    )
+
+
+def test_massive_fanout_search_vector_resilience(
+    massive_te_zip_bytes: bytes, pipeline_results: Callable[[bytes, str], Tuple[Dict[str, Any], ...]]
+) -> None:
     """
     Test resilience when a product has an extreme number of TE codes (e.g., 5,000).
     The pipeline logic for `search_vector` concatenates these.
@@ -24,91 +49,43 @@ def test_massive_fanout_search_vector_resilience() -> None:
     2. It handles the concatenation (might result in truncated or huge string, but no crash).
     3. Performance is reasonable (tested via implicit timeout).
     """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        # 1 Product
-        z.writestr("Products.txt", "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000001\t001\tF\tS\tIng")
-        z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n000001\tORIG\t2020-01-01")
-
-        # 5,000 TE Codes for the same product
-        # Current logic: Left Join TE on [ApplNo, ProductNo].
-        # Wait, Gold logic implementation of TE Join:
-        # df_te_sub = df_te.select(["appl_no", "product_no", "te_code"]).unique(subset=["appl_no", "product_no"])
-        # It takes UNIQUE subset. So it picks ONE TE code per product.
-        # This prevents fanout.
-        # So 5,000 rows in TE.txt for same product -> collapse to 1 row.
-        # This test verifies that the collapse is efficient and works.
-
-        te_rows = ["ApplNo\tProductNo\tTECode"]
-        for i in range(5000):
-            te_rows.append(f"000001\t001\tTE{i}")
-
-        z.writestr("TE.txt", "\n".join(te_rows))
-
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        gold_prods = list(source.resources["fda_drugs_gold_products"])
+    gold_prods = pipeline_results(massive_te_zip_bytes, "fda_drugs_gold_products")
 
-        assert len(gold_prods) == 1
-        row = gold_prods[0]
+    assert len(gold_prods) == 1
+    row = gold_prods[0]
 
-        # Verify it picked one TE code (deterministically the first or one of them)
-        # Polars unique might pick any, usually first if stable.
-        # With 5000 input rows, we expect 1 output row.
-        assert row["te_code"] is not None
-        assert row["te_code"].startswith("TE")
+    # Verify it picked one TE code (deterministically the first or one of them)
+    # Polars unique might pick any, usually first if stable.
+    # With 5000 input rows, we expect 1 output row.
+    assert row["te_code"] is not None
+    assert row["te_code"].startswith("TE")
 
-        # Search vector should contain that one TE code, not 5000 of them.
-        assert len(row["search_vector"]) < 1000  # Should be small if deduplicated
+    # Search vector should contain that one TE code, not 5000 of them.
+    assert len(row["search_vector"]) < 1000  # Should be small if deduplicated
 
 
-def test_massive_active_ingredients_list() -> None:
+def test_massive_active_ingredients_list(
+    massive_ingredients_zip_bytes: bytes, pipeline_results: Callable[[bytes, str], Tuple[Dict[str, Any], ...]]
+) -> None:
     """
     Test a product with 1,000 distinct active ingredients in the `ActiveIngredient` string.
     Logic splits by ';'.
     This creates a list of 1,000 strings.
     Verify `search_vector` (which joins them) handles this massive string generation.
     """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        # Create 1000 ingredients joined by ;
-        ingredients = ";".join([f"Ing{i}" for i in range(1000)])
-
-        z.writestr(
-            "Products.txt",
-            f"ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000001\t001\tF\tS\t{ingredients}",
-        )
-        z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n000001\tORIG\t2020-01-01")
-
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        silver_prods = list(source.resources["fda_drugs_silver_products"])
-        gold_prods = list(source.resources["fda_drugs_gold_products"])
-
-        assert len(silver_prods) == 1
-        row = silver_prods[0]
-
-        # Verify list length
-        assert len(row["active_ingredients_list"]) == 1000
-        assert row["active_ingredients_list"][0] == "ING0"
-
-        # Verify Gold Search Vector
-        # It joins them with " ".
-        # Length approx 1000 * 4 chars + spaces ~ 5000 chars.
-        gold_row = gold_prods[0]
-        assert len(gold_row["search_vector"]) > 4000
-        assert "ING999" in gold_row["search_vector"]
+    silver_prods = pipeline_results(massive_ingredients_zip_bytes, "fda_drugs_silver_products")
+    gold_prods = pipeline_results(massive_ingredients_zip_bytes, "fda_drugs_gold_products")
+
+    assert len(silver_prods) == 1
+    row = silver_prods[0]
+
+    # Verify list length
+    assert len(row["active_ingredients_list"]) == 1000
+    assert row["active_ingredients_list"][0] == "ING0"
+
+    # Verify Gold Search Vector
+    # It joins them with " ".
+    # Length approx 1000 * 4 chars + spaces ~ 5000 chars.
+    gold_row = gold_prods[0]
+    assert len(gold_row["search_vector"]) > 4000
+    assert "ING999" in gold_row["search_vector"]
@@ -8,75 +8,59 @@
 #
 # Source Code: https://github.com/CoReason-AI/coreason_etl_drugs_fda
 
-import io
-import zipfile
-from unittest.mock import MagicMock, patch
+from typing import Any, Callable, Dict, Mapping, Tuple, Union
 
-from coreason_etl_drugs_fda.source import drugs_fda_source
+import pytest
 
 
-def test_submissions_schema_mismatch_missing_columns() -> None:
+@pytest.fixture(scope="session")  # type: ignore[misc]
+def submissions_missing_columns_zip_bytes(make_zip: Callable[[Mapping[str, Union[str, bytes]]], bytes]) -> bytes:
+    """Submissions file exists but is MISSING `SubmissionType`."""
+    return make_zip({"Submissions.txt": "ApplNo\tWrongColumn\n000001\tData"})
+
+
+@pytest.fixture(scope="session")  # type: ignore[misc]
+def lookup_missing_description_zip_bytes(make_zip: Callable[[Mapping[str, Union[str, bytes]]], bytes]) -> bytes:
+    """Lookup file exists but is missing the Description column."""
+    return make_zip(
+        {
+            "MarketingStatus.txt": "ApplNo\tProductNo\tMarketingStatusID\n000001\t001\t1",
+            "MarketingStatus_Lookup.txt": "MarketingStatusID\tWrongCol\n1\tVal",
+        }
+    )
+
+
+def test_submissions_schema_mismatch_missing_columns(
+    submissions_missing_columns_zip_bytes: bytes, pipeline_results: Callable[[bytes, str], Tuple[Dict[str, Any], ...]]
+) -> None:
     """
     Test resilience when `Submissions.txt` exists but is missing required columns
     (e.g., `SubmissionType` or `SubmissionStatusDate`).
     The `extract_orig_dates` function should gracefully handle this by returning an empty map,
     rather than crashing with a ColumnNotFoundError during lazy evaluation.
     """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        z.writestr("Products.txt", "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000001\t001\tF\tS\tIng")
-
-        # Submissions file exists but MISSING `SubmissionType`
-        z.writestr("Submissions.txt", "ApplNo\tWrongColumn\n000001\tData")
-
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+    # This should NOT crash.
+    # extract_orig_dates checks for columns before filtering.
+    silver_prods = pipeline_results(submissions_missing_columns_zip_bytes, "fda_drugs_silver_products")
 
-        source = drugs_fda_source()
+    assert len(silver_prods) == 1
+    row = silver_prods[0]
 
-        # This should NOT crash.
-        # extract_orig_dates checks for columns before filtering.
-        silver_prods = list(source.resources["fda_drugs_silver_products"])
+    # Approval date should be None since we couldn't parse submissions
+    assert row["original_approval_date"] is None
 
-        assert len(silver_prods) == 1
-        row = silver_prods[0]
 
-        # Approval date should be None since we couldn't parse submissions
-        assert row["original_approval_date"] is None
-
-
-def test_marketing_lookup_schema_mismatch() -> None:
+def test_marketing_lookup_schema_mismatch(
+    lookup_missing_description_zip_bytes: bytes, pipeline_results: Callable[[bytes, str], Tuple[Dict[str, Any], ...]]
+) -> None:
     """
     Test resilience when `MarketingStatus_Lookup.txt` is missing the `MarketingStatusDescription` column.
     The join logic should verify columns exist before joining, avoiding a crash.
     """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        z.writestr("Products.txt", "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000001\t001\tF\tS\tIng")
-        z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n000001\tORIG\t2020-01-01")
-        z.writestr("MarketingStatus.txt", "ApplNo\tProductNo\tMarketingStatusID\n000001\t001\t1")
-
-        # Lookup file exists but missing Description column
-        z.writestr("MarketingStatus_Lookup.txt", "MarketingStatusID\tWrongCol\n1\tVal")
-
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        gold_prods = list(source.resources["fda_drugs_gold_products"])
+    gold_prods = pipeline_results(lookup_missing_description_zip_bytes, "fda_drugs_gold_products")
 
-        assert len(gold_prods) == 1
-        row = gold_prods[0]
+    assert len(gold_prods) == 1
+    row = gold_prods[0]
 
-        # Should be None/Null, not crash
-        assert row["marketing_status_description"] is None
+    # Should be None/Null, not crash
+    assert row["marketing_status_description"] is None
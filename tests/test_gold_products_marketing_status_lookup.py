@@ -8,49 +8,37 @@
 #
 # Source Code: https://github.com/CoReason-AI/coreason_etl_drugs_fda
 
-import io
-import zipfile
-from unittest.mock import MagicMock, patch
+from typing import Any, Callable, Dict, Mapping, Tuple, Union
 
-from coreason_etl_drugs_fda.source import drugs_fda_source
+import pytest
 
 
-def test_gold_products_marketing_status_lookup() -> None:
+@pytest.fixture(scope="session")  # type: ignore[misc]
+def marketing_status_lookup_zip_bytes(make_zip: Callable[[Mapping[str, Union[str, bytes]]], bytes]) -> bytes:
     """
-    Test Gold layer joins MarketingStatus_Lookup to get marketing_status_description.
+    The base product plus MarketingStatus (links ApplNo+ProductNo to MarketingStatusID)
+    and MarketingStatus_Lookup (links MarketingStatusID to Description). ID 1 -> Prescription.
     """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        # Products
-        z.writestr("Products.txt", "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000001\t001\tF\tS\tIng")
-
-        # Submissions (required for Silver base)
-        z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n000001\tORIG\t2020-01-01")
-
-        # MarketingStatus (Links ApplNo+ProductNo to MarketingStatusID)
-        # ID 1 -> Prescription
-        z.writestr("MarketingStatus.txt", "ApplNo\tProductNo\tMarketingStatusID\n000001\t001\t1")
-
-        # MarketingStatus_Lookup (Links MarketingStatusID to Description)
-        # ID 1 -> Prescription
-        z.writestr("MarketingStatus_Lookup.txt", "MarketingStatusID\tMarketingStatusDescription\n1\tPrescription")
+    return make_zip(
+        {
+            "MarketingStatus.txt": "ApplNo\tProductNo\tMarketingStatusID\n000001\t001\t1",
+            "MarketingStatus_Lookup.txt": "MarketingStatusID\tMarketingStatusDescription\n1\tPrescription",
+        }
+    )
 
-    buffer.seek(0)
-    mock_content = buffer.getvalue()
 
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = mock_content
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        gold_prods = list(source.resources["fda_drugs_gold_products"])
-        assert len(gold_prods) == 1
-        row = gold_prods[0]
+def test_gold_products_marketing_status_lookup(
+    marketing_status_lookup_zip_bytes: bytes, pipeline_results: Callable[[bytes, str], Tuple[Dict[str, Any], ...]]
+) -> None:
+    """
+    Test Gold layer joins MarketingStatus_Lookup to get marketing_status_description.
+    """
+    gold_prods = pipeline_results(marketing_status_lookup_zip_bytes, "fda_drugs_gold_products")
+    assert len(gold_prods) == 1
+    row = gold_prods[0]
 
-        # Verify ID was joined
-        assert row["marketing_status_id"] == 1
+    # Verify ID was joined
+    assert row["marketing_status_id"] == 1
 
-        # Verify Description was enriched (This should FAIL before implementation)
-        assert row["marketing_status_description"] == "Prescription"
+    # Verify Description was enriched (This should FAIL before implementation)
+    assert row["marketing_status_description"] == "Prescription"
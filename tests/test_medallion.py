@@ -8,9 +8,9 @@
 #
 # Source Code: https://github.com/CoReason-AI/coreason_etl_drugs_fda
 
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
-from coreason_etl_drugs_fda.utils.medallion import organize_schemas
+from coreason_etl_drugs_fda.utils.medallion import organize_schemas, organize_schemas_async
 
 
 def test_organize_schemas_postgres() -> None:
@@ -25,13 +25,15 @@ def test_organize_schemas_postgres() -> None:
 
     # Mock Tables in Default Schema (using dlt normalized names based on our check)
     # Using the 'fd_aa_...' structure found in verification
-    mock_pipeline.default_schema.tables.keys.return_value = [
-        "fd_aa_drugs_bronze_fda_products",
-        "fd_aa_drugs_silver_products",
-        "fd_aa_drugs_gold_drug_product",
-        "other_table",
-        "_dlt_loads",
-    ]
+    mock_pipeline.default_schema.tables = dict.fromkeys(
+        [
+            "fd_aa_drugs_bronze_fda_products",
+            "fd_aa_drugs_silver_products",
+            "fd_aa_drugs_gold_drug_product",
+            "other_table",
+            "_dlt_loads",
+        ]
+    )
 
     # Mock SQL Client
     mock_client = MagicMock()
@@ -41,23 +43,34 @@ def test_organize_schemas_postgres() -> None:
     # Execute
     organize_schemas(mock_pipeline)
 
-    # Verify Schema Creation
-    mock_client.execute_sql.assert_any_call("CREATE SCHEMA IF NOT EXISTS bronze;")
-    mock_client.execute_sql.assert_any_call("CREATE SCHEMA IF NOT EXISTS silver;")
-    mock_client.execute_sql.assert_any_call("CREATE SCHEMA IF NOT EXISTS gold;")
+    # Verify Schema Creation is issued as one statement batch
+    ddl_calls = [c[0][0] for c in mock_client.execute_sql.call_args_list if "CREATE SCHEMA" in c[0][0]]
+    assert len(ddl_calls) == 1
+    assert "CREATE SCHEMA IF NOT EXISTS bronze;" in ddl_calls[0]
+    assert "CREATE SCHEMA IF NOT EXISTS silver;" in ddl_calls[0]
+    assert "CREATE SCHEMA IF NOT EXISTS gold;" in ddl_calls[0]
+
+    # Session settings ride along in the same batch
+    assert ddl_calls[0].startswith("SET LOCAL synchronous_commit = off;")
+    assert "SET LOCAL application_name = 'coreason_organize_schemas';" in ddl_calls[0]
+
+    # Verify Table Moves (one DO block per table, in the same batch and transaction)
+    mock_client.begin_transaction.assert_called_once()
+    mock_client.execute_sql.assert_called_once()
+    sqls = [c[0][0] for c in mock_client.execute_sql.call_args_list]
+    assert sqls[0].count("DO $coreason_move$ BEGIN") == 3
 
-    # Verify Table Moves
     # Bronze
     expected_bronze = 'ALTER TABLE "fda_data"."fd_aa_drugs_bronze_fda_products" SET SCHEMA "bronze";'
-    mock_client.execute_sql.assert_any_call(expected_bronze)
+    assert any(expected_bronze in sql for sql in sqls)
 
     # Silver
     expected_silver = 'ALTER TABLE "fda_data"."fd_aa_drugs_silver_products" SET SCHEMA "silver";'
-    mock_client.execute_sql.assert_any_call(expected_silver)
+    assert any(expected_silver in sql for sql in sqls)
 
     # Gold
     expected_gold = 'ALTER TABLE "fda_data"."fd_aa_drugs_gold_drug_product" SET SCHEMA "gold";'
-    mock_client.execute_sql.assert_any_call(expected_gold)
+    assert any(expected_gold in sql for sql in sqls)
 
     # Ensure unrelated tables are not moved
     # calls is a list of call objects.
@@ -68,9 +81,9 @@ def test_organize_schemas_postgres() -> None:
 
 
 def test_organize_schemas_skip_non_postgres() -> None:
-    """Test that function returns early for non-postgres destinations."""
+    """Test that function returns early for destinations without schema support."""
     mock_pipeline = MagicMock()
-    mock_pipeline.destination.destination_name = "duckdb"
+    mock_pipeline.destination.destination_name = "filesystem"
 
     # Should not access sql_client
     organize_schemas(mock_pipeline)
@@ -81,17 +94,177 @@ def test_organize_schemas_exception_handling() -> None:
     """Test that exceptions during table moves are caught and logged."""
     mock_pipeline = MagicMock()
     mock_pipeline.destination.destination_name = "postgres"
-    mock_pipeline.default_schema.tables.keys.return_value = ["fd_aa_drugs_bronze_table"]
+    mock_pipeline.dataset_name = "fda_data"
+    mock_pipeline.default_schema.tables = dict.fromkeys(["fd_aa_drugs_bronze_table"])
+
+    mock_client = MagicMock()
+    mock_client.__enter__.return_value = mock_client
+    mock_pipeline.sql_client.return_value = mock_client
+
+    # The ALTER fails server-side: its DO block downgrades the error to a WARNING,
+    # so the table never reaches the migration log (both manifest reads come back empty)
+    mock_cursor = mock_client.execute_query.return_value.__enter__.return_value
+    mock_cursor.iter_fetch.return_value = []
+
+    with patch("coreason_etl_drugs_fda.utils.medallion.logger") as mock_logger:
+        organize_schemas(mock_pipeline)
+
+    # Should complete without raising exception in a single batch with the handler in place
+    mock_client.execute_sql.assert_called_once()
+    assert "EXCEPTION WHEN OTHERS THEN RAISE WARNING" in mock_client.execute_sql.call_args[0][0]
+    assert mock_client.execute_query.call_count == 2
+
+    # The partial migration is surfaced instead of dropping anything
+    mock_logger.warning.assert_any_call(
+        "Failed to move table fd_aa_drugs_bronze_table; see the Postgres server log for the cause"
+    )
+    mock_logger.warning.assert_any_call("Leaving 1 unmigrated tables in schema fda_data")
+    for call_args in mock_client.execute_sql.call_args_list:
+        assert "DROP" not in call_args[0][0]
+
+
+def test_organize_schemas_skips_migrated_tables() -> None:
+    """Test that tables recorded in the migration log are not moved again."""
+    mock_pipeline = MagicMock()
+    mock_pipeline.destination.destination_name = "postgres"
+    mock_pipeline.dataset_name = "fda_data"
+    mock_pipeline.default_schema.tables = dict.fromkeys(
+        [
+            "fd_aa_drugs_bronze_fda_products",
+            "fd_aa_drugs_silver_products",
+        ]
+    )
 
     mock_client = MagicMock()
     mock_client.__enter__.return_value = mock_client
     mock_pipeline.sql_client.return_value = mock_client
 
-    # Raise exception on execute_sql
-    mock_client.execute_sql.side_effect = [None, None, None, Exception("DB Error")]
-    # First 3 calls are CREATE SCHEMA, 4th call is ALTER TABLE
+    # Manifest already contains both tables, streamed across two fetch chunks
+    mock_cursor = mock_client.execute_query.return_value.__enter__.return_value
+    mock_cursor.iter_fetch.return_value = [[("fd_aa_drugs_bronze_fda_products",)], [("fd_aa_drugs_silver_products",)]]
 
     organize_schemas(mock_pipeline)
 
-    # Should complete without raising exception
-    assert mock_client.execute_sql.call_count == 4
+    # Only the manifest read is issued; no CREATE SCHEMA or ALTER TABLE
+    assert "_coreason_migration_log" in mock_client.execute_query.call_args[0][0]
+    mock_client.execute_sql.assert_not_called()
+
+
+def test_organize_schemas_records_new_tables() -> None:
+    """Test that only new tables are moved and recorded in the same batch."""
+    mock_pipeline = MagicMock()
+    mock_pipeline.destination.destination_name = "postgres"
+    mock_pipeline.dataset_name = "fda_data"
+    mock_pipeline.default_schema.tables = dict.fromkeys(
+        [
+            "fd_aa_drugs_bronze_fda_products",
+            "fd_aa_drugs_gold_products",
+        ]
+    )
+
+    mock_client = MagicMock()
+    mock_client.__enter__.return_value = mock_client
+    mock_pipeline.sql_client.return_value = mock_client
+
+    mock_cursor = mock_client.execute_query.return_value.__enter__.return_value
+    # The manifest is read before the batch and again after it, once the gold table is logged
+    mock_cursor.iter_fetch.side_effect = [
+        [[("fd_aa_drugs_bronze_fda_products",)]],
+        [[("fd_aa_drugs_bronze_fda_products",), ("fd_aa_drugs_gold_products",)]],
+    ]
+
+    with patch("coreason_etl_drugs_fda.utils.medallion.logger") as mock_logger:
+        organize_schemas(mock_pipeline)
+
+    mock_client.execute_sql.assert_called_once()
+    batch = mock_client.execute_sql.call_args[0][0]
+    assert "fd_aa_drugs_bronze_fda_products" not in batch
+    assert 'ALTER TABLE "fda_data"."fd_aa_drugs_gold_products" SET SCHEMA "gold";' in batch
+    assert 'INSERT INTO "bronze"."_coreason_migration_log"' in batch
+    assert "VALUES ('fd_aa_drugs_gold_products', 'gold')" in batch
+    mock_logger.warning.assert_not_called()
+
+
+def test_organize_schemas_bootstraps_missing_manifest() -> None:
+    """Test that a missing migration log (first deployment) is treated as an empty manifest."""
+    mock_pipeline = MagicMock()
+    mock_pipeline.destination.destination_name = "postgres"
+    mock_pipeline.dataset_name = "fda_data"
+    mock_pipeline.default_schema.tables = dict.fromkeys(["fd_aa_drugs_bronze_table"])
+
+    mock_client = MagicMock()
+    mock_client.__enter__.return_value = mock_client
+    mock_pipeline.sql_client.return_value = mock_client
+
+    # The manifest read fails because the log table does not exist yet
+    mock_client.execute_query.side_effect = Exception("relation does not exist")
+
+    organize_schemas(mock_pipeline)
+
+    batch = mock_client.execute_sql.call_args[0][0]
+    assert 'CREATE TABLE IF NOT EXISTS "bronze"."_coreason_migration_log"' in batch
+    assert 'ALTER TABLE "fda_data"."fd_aa_drugs_bronze_table" SET SCHEMA "bronze";' in batch
+    assert batch.index("CREATE TABLE IF NOT EXISTS") < batch.index('INSERT INTO "bronze"."_coreason_migration_log"')
+
+
+def test_organize_schemas_strict_durability() -> None:
+    """Test that strict_durability keeps synchronous commit but still tags the session."""
+    mock_pipeline = MagicMock()
+    mock_pipeline.destination.destination_name = "postgres"
+    mock_pipeline.dataset_name = "fda_data"
+    mock_pipeline.default_schema.tables = dict.fromkeys(["fd_aa_drugs_bronze_table"])
+
+    mock_client = MagicMock()
+    mock_client.__enter__.return_value = mock_client
+    mock_pipeline.sql_client.return_value = mock_client
+
+    organize_schemas(mock_pipeline, strict_durability=True)
+
+    setup_sql = mock_client.execute_sql.call_args_list[0][0][0]
+    assert "synchronous_commit" not in setup_sql
+    assert setup_sql.startswith("SET LOCAL application_name = 'coreason_organize_schemas';")
+
+
+def test_organize_schemas_duckdb() -> None:
+    """Test that DuckDB publishes layer views without savepoints or an outer transaction."""
+    mock_pipeline = MagicMock()
+    mock_pipeline.destination.destination_name = "duckdb"
+    mock_pipeline.dataset_name = "fda_data"
+    mock_pipeline.default_schema.tables = dict.fromkeys(
+        [
+            "fda_drugs_bronze_products",
+            "fda_drugs_gold_products",
+        ]
+    )
+
+    mock_client = MagicMock()
+    mock_client.__enter__.return_value = mock_client
+    mock_pipeline.sql_client.return_value = mock_client
+
+    # The gold view fails; DuckDB has no savepoint to roll back to
+    mock_client.execute_sql.side_effect = [None, None, Exception("Catalog Error"), None]
+
+    organize_schemas(mock_pipeline)
+
+    mock_client.begin_transaction.assert_not_called()
+    sqls = [c[0][0] for c in mock_client.execute_sql.call_args_list]
+    assert len(sqls) == 4
+    assert sqls[1] == (
+        'CREATE OR REPLACE VIEW "bronze"."fda_drugs_bronze_products" AS '
+        'SELECT * FROM "fda_data"."fda_drugs_bronze_products";'
+    )
+    assert not any("SAVEPOINT" in sql or "SET LOCAL" in sql for sql in sqls)
+
+    # Only the successful view is recorded
+    assert mock_client.execute_sql.call_args_list[-1][0][1:] == ("fda_drugs_bronze_products", "bronze")
+
+
+def test_organize_schemas_async() -> None:
+    """Test that the async variant runs the hook on a background thread and returns a Future."""
+    mock_pipeline = MagicMock()
+
+    with patch("coreason_etl_drugs_fda.utils.medallion.organize_schemas") as mock_organize:
+        future = organize_schemas_async(mock_pipeline, strict_durability=True)
+        assert future.result(timeout=5) is mock_organize.return_value
+
+    mock_organize.assert_called_once_with(mock_pipeline, True)
@@ -8,7 +8,7 @@
 #
 # Source Code: https://github.com/CoReason-AI/coreason_etl_drugs_fda
 
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from coreason_etl_drugs_fda.utils.medallion import organize_schemas
 
@@ -24,36 +24,31 @@ def test_organize_schemas_idempotency() -> None:
     The hook iterates over `pipeline.default_schema.tables`, which reflects the *intended* state,
     not necessarily the current DB state.
 
-    If the table is missing from source schema (because it was moved), execute_sql will raise.
-    Our code catches Exception and logs warning.
-    We need to verify that this warning is logged and the process continues.
+    If the table is missing from source schema (because it was moved), the ALTER fails.
+    Each move's DO block turns the error into a server-side warning, so the batch continues.
+    We need to verify that the unmoved tables are reported and the process continues.
     """
     mock_pipeline = MagicMock()
     mock_pipeline.destination.destination_name = "postgres"
     mock_pipeline.dataset_name = "fda_data"
-    mock_pipeline.default_schema.tables.keys.return_value = ["fd_aa_drugs_bronze_t1", "fd_aa_drugs_silver_t2"]
+    mock_pipeline.default_schema.tables = dict.fromkeys(["fd_aa_drugs_bronze_t1", "fd_aa_drugs_silver_t2"])
 
     mock_client = MagicMock()
     mock_client.__enter__.return_value = mock_client
     mock_pipeline.sql_client.return_value = mock_client
 
-    # First run: Success
-    # Second run: DB Error (Table not found)
-
-    # We simulate this by having execute_sql raise an error for the ALTER statements
-    error = Exception("relation does not exist")
-    mock_client.execute_sql.side_effect = [
-        None,
-        None,
-        None,  # CREATE SCHEMAS
-        error,  # ALTER Bronze
-        error,  # ALTER Silver
-    ]
+    # Both ALTERs fail (relation does not exist), so neither table is logged:
+    # the manifest read after the batch comes back empty
+    mock_cursor = mock_client.execute_query.return_value.__enter__.return_value
+    mock_cursor.iter_fetch.return_value = []
 
-    organize_schemas(mock_pipeline)
+    with patch("coreason_etl_drugs_fda.utils.medallion.logger") as mock_logger:
+        organize_schemas(mock_pipeline)
 
-    # It should have attempted all calls
-    assert mock_client.execute_sql.call_count == 5
+    # Both moves went out in one batch, and nothing was recorded in the manifest
+    assert mock_client.execute_sql.call_count == 1
+    assert mock_client.execute_sql.call_args[0][0].count("EXCEPTION WHEN OTHERS") == 2
+    mock_logger.warning.assert_any_call("Leaving 2 unmigrated tables in schema fda_data")
 
 
 def test_organize_schemas_sql_injection_defense() -> None:
@@ -68,7 +63,7 @@ def test_organize_schemas_sql_injection_defense() -> None:
     # A nasty table name that might try to break out of quotes
     nasty_table = 'fd_aa_drugs_bronze_"; DROP TABLE students; --'
 
-    mock_pipeline.default_schema.tables.keys.return_value = [nasty_table]
+    mock_pipeline.default_schema.tables = dict.fromkeys([nasty_table])
 
     mock_client = MagicMock()
     mock_client.__enter__.return_value = mock_client
@@ -76,24 +71,102 @@ def test_organize_schemas_sql_injection_defense() -> None:
 
     organize_schemas(mock_pipeline)
 
-    # Verify the SQL constructed
-    # expected: ALTER TABLE "fda_data"."fd_aa_drugs_bronze_"; DROP TABLE students; --" SET SCHEMA "bronze";
-    # The internal quotes should remain part of the identifier.
-    # Postgres identifiers with double quotes need escaping if they contain double quotes.
-    # Python f-string doesn't auto-escape double quotes inside the string for SQL.
-    # If our implementation just does f'"{table_name}"', then a " inside table_name will close the quote.
+    # Verify the SQL constructed: embedded double quotes are doubled, so the name stays one
+    # quoted identifier and its "; DROP TABLE ... --" tail cannot end the statement.
+    args = next(c[0][0] for c in mock_client.execute_sql.call_args_list if "ALTER TABLE" in c[0][0])
+
+    escaped = nasty_table.replace('"', '""')
+    assert f'ALTER TABLE "fda_data"."{escaped}" SET SCHEMA "bronze";' in args
+    assert f'"{nasty_table}"' not in args
+
+
+def test_organize_schemas_postgres_batch_failure() -> None:
+    """Test that a failing batch is logged and leaves every table pending instead of raising."""
+    mock_pipeline = MagicMock()
+    mock_pipeline.destination.destination_name = "postgres"
+    mock_pipeline.dataset_name = "fda_data"
+    mock_pipeline.default_schema.tables = dict.fromkeys(["fd_aa_drugs_bronze_t1", "fd_aa_drugs_silver_t2"])
+
+    mock_client = MagicMock()
+    mock_client.__enter__.return_value = mock_client
+    mock_pipeline.sql_client.return_value = mock_client
+    mock_client.execute_sql.side_effect = Exception("syntax error at or near")
+
+    with patch("coreason_etl_drugs_fda.utils.medallion.logger") as mock_logger:
+        organize_schemas(mock_pipeline)
+
+    mock_logger.warning.assert_any_call("Failed to move tables in schema fda_data: syntax error at or near")
+    mock_logger.warning.assert_any_call("Leaving 2 unmigrated tables in schema fda_data")
+
+
+def test_organize_schemas_postgres_do_tag_in_table_name() -> None:
+    """Test that a table name containing the DO block delimiter is left out of the batch and warned about once."""
+    mock_pipeline = MagicMock()
+    mock_pipeline.destination.destination_name = "postgres"
+    mock_pipeline.dataset_name = "fda_data"
+    tagged_table = "fd_aa_drugs_bronze_$coreason_move$"
+    mock_pipeline.default_schema.tables = dict.fromkeys([tagged_table, "fd_aa_drugs_silver_t2"])
+
+    mock_client = MagicMock()
+    mock_client.__enter__.return_value = mock_client
+    mock_pipeline.sql_client.return_value = mock_client
 
-    # Current implementation: f'ALTER TABLE "{dataset_name}"."{table_name}" SET SCHEMA "{target_schema}";'
-    # If table_name has ", it becomes: "..."..."...
-    # This IS a vulnerability if dlt allows such names.
-    # However, dlt normalization normally strips quotes.
-    # But let's verify what we send to execute_sql.
+    # Only the regular table shows up in the manifest read after the batch
+    mock_cursor = mock_client.execute_query.return_value.__enter__.return_value
+    mock_cursor.iter_fetch.side_effect = [[], [[("fd_aa_drugs_silver_t2",)]]]
 
-    args = mock_client.execute_sql.call_args_list[-1][0][0]
+    with patch("coreason_etl_drugs_fda.utils.medallion.logger") as mock_logger:
+        organize_schemas(mock_pipeline)
 
-    # We expect the string to contain the nasty table name exactly as passed, wrapped in quotes.
-    expected_part = f'"{nasty_table}"'
-    assert expected_part in args
+    batch = mock_client.execute_sql.call_args[0][0]
+    assert batch.count("EXCEPTION WHEN OTHERS") == 1
+    assert tagged_table not in batch
+
+    warnings = [c[0][0] for c in mock_logger.warning.call_args_list]
+    assert warnings == [
+        f"Failed to move table {tagged_table}: name contains the DO block delimiter",
+        "Leaving 1 unmigrated tables in schema fda_data",
+    ]
+
+
+def test_organize_schemas_duckdb_setup_failure() -> None:
+    """Test that a failing setup DDL on DuckDB is logged and leaves every table pending instead of raising."""
+    mock_pipeline = MagicMock()
+    mock_pipeline.destination.destination_name = "duckdb"
+    mock_pipeline.dataset_name = "fda_data"
+    mock_pipeline.default_schema.tables = dict.fromkeys(["fda_drugs_bronze_products", "fda_drugs_gold_products"])
+
+    mock_client = MagicMock()
+    mock_client.__enter__.return_value = mock_client
+    mock_pipeline.sql_client.return_value = mock_client
+    mock_client.execute_sql.side_effect = Exception("database is read-only")
+
+    with patch("coreason_etl_drugs_fda.utils.medallion.logger") as mock_logger:
+        organize_schemas(mock_pipeline)
+
+    # No view is attempted once the setup DDL has failed
+    assert mock_client.execute_sql.call_count == 1
+    mock_logger.warning.assert_any_call("Failed to move tables in schema fda_data: database is read-only")
+    mock_logger.warning.assert_any_call("Leaving 2 unmigrated tables in schema fda_data")
+
+
+def test_organize_schemas_duckdb_log_failure() -> None:
+    """Test that a failing migration-log INSERT on DuckDB is logged and keeps the published views."""
+    mock_pipeline = MagicMock()
+    mock_pipeline.destination.destination_name = "duckdb"
+    mock_pipeline.dataset_name = "fda_data"
+    mock_pipeline.default_schema.tables = dict.fromkeys(["fda_drugs_bronze_products"])
+
+    mock_client = MagicMock()
+    mock_client.__enter__.return_value = mock_client
+    mock_pipeline.sql_client.return_value = mock_client
+    mock_client.execute_sql.side_effect = [None, None, Exception("database is locked")]
+
+    with patch("coreason_etl_drugs_fda.utils.medallion.logger") as mock_logger:
+        organize_schemas(mock_pipeline)
+
+    warnings = [c[0][0] for c in mock_logger.warning.call_args_list]
+    assert warnings == ["Failed to record moved tables in schema fda_data: database is locked"]
 
 
 def test_organize_schemas_mixed_case_normalization() -> None:
@@ -105,7 +178,7 @@ def test_organize_schemas_mixed_case_normalization() -> None:
     mock_pipeline.destination.destination_name = "postgres"
     mock_pipeline.dataset_name = "fda_data"
     # Simulating a case where dlt preserved case or we have weird normalization
-    mock_pipeline.default_schema.tables.keys.return_value = ["FD_AA_DRUGS_BRONZE_UPPER", "fd_aa_drugs_Silver_Mixed"]
+    mock_pipeline.default_schema.tables = dict.fromkeys(["FD_AA_DRUGS_BRONZE_UPPER", "fd_aa_drugs_Silver_Mixed"])
 
     mock_client = MagicMock()
     mock_client.__enter__.return_value = mock_client
@@ -113,15 +186,8 @@ def test_organize_schemas_mixed_case_normalization() -> None:
 
     organize_schemas(mock_pipeline)
 
-    # Check checks
-    # Our implementation uses `if "_bronze_" in table_name`.
-    # If table_name is uppercase, this fails.
-    # We should update implementation to be case-insensitive if we want robustness.
-    # But for this test, let's see what happens.
-
-    # If logic is strictly looking for lowercase, these might be missed.
-    # Let's verify if they were moved.
-
+    # Layer matching is case-insensitive, so both tables are moved even though
+    # dlt normally normalizes names to lowercase snake_case.
     found_bronze = False
     found_silver = False
 
@@ -132,18 +198,5 @@ def test_organize_schemas_mixed_case_normalization() -> None:
         if 'SET SCHEMA "silver"' in sql:
             found_silver = True
 
-    # Assuming current implementation is case-sensitive (it is), these assertions might fail
-    # if we expect it to handle uppercase.
-    # But dlt normalizes to snake_case (lowercase).
-    # So this test mainly documents that we rely on dlt normalization.
-    # If we pass, it means we didn't match.
-
-    # If we want to support it, we should lower() the check.
-    # Let's assert they are NOT moved currently, or update code to support it.
-    # Given "Robustness" requirement, updating code to .lower() is better.
-    # But for now, let's assert what the code DOES.
-
-    # Current code: if "_bronze_" in table_name ...
-    # "FD_AA_DRUGS_BRONZE_UPPER" -> no match.
-    assert not found_bronze
-    assert not found_silver
+    assert found_bronze
+    assert found_silver
@@ -8,64 +8,52 @@
 #
 # Source Code: https://github.com/CoReason-AI/coreason_etl_drugs_fda
 
-import io
-import zipfile
 from datetime import date
-from unittest.mock import MagicMock, patch
+from typing import Callable, Mapping, Union
 
 import polars as pl
 import pytest
+from dlt.sources import DltSource
 from pydantic import ValidationError
 
 from coreason_etl_drugs_fda.silver import ProductSilver
-from coreason_etl_drugs_fda.source import drugs_fda_source
 from coreason_etl_drugs_fda.transform import clean_ingredients
 
 
-def test_search_vector_full_complexity() -> None:
+def test_search_vector_full_complexity(
+    source_factory: Callable[[bytes], DltSource], make_zip: Callable[[Mapping[str, Union[str, bytes]]], bytes]
+) -> None:
     """
     Test search_vector generation with:
     - Unicode characters in DrugName and Sponsor.
     - Multiple ingredients.
     - Missing TE code (null).
     """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        # DrugName: "Trâdemark®"
-        # ActiveIngredient: "IngA; IngB"
-        # Must encode as CP1252 because source reads as CP1252
-        products = (
-            "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\tDrugName\n000001\t001\tF\tS\tIngA; IngB\tTrâdemark®"
-        )
-        z.writestr("Products.txt", products.encode("cp1252"))
-
-        z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n000001\tORIG\t2020-01-01")
-
-        # Sponsor: "Spönsör"
-        apps = "ApplNo\tSponsorName\tApplType\n000001\tSpönsör\tN"
-        z.writestr("Applications.txt", apps.encode("cp1252"))
-        # TE missing
-
-    buffer.seek(0)
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        gold_prods = list(source.resources["fda_drugs_gold_products"])
-        row = gold_prods[0]
-
-        # Expected: "TRÂDEMARK® INGA INGB SPÖNSÖR" (Uppercased)
-        # Note: upper() on special chars depends on locale/python version but usually works for standard unicode.
-        # "Trâdemark®".upper() -> "TRÂDEMARK®"
-        # "Spönsör".upper() -> "SPÖNSÖR"
-        target = "TRÂDEMARK® INGA INGB SPÖNSÖR"
-        assert row["search_vector"] == target
-
-
-def test_exclusivity_boundary_today() -> None:
+    # DrugName: "Trâdemark®"
+    # ActiveIngredient: "IngA; IngB"
+    # Must encode as CP1252 because source reads as CP1252
+    products = (
+        "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\tDrugName\n000001\t001\tF\tS\tIngA; IngB\tTrâdemark®"
+    )
+    # Sponsor: "Spönsör"
+    apps = "ApplNo\tSponsorName\tApplType\n000001\tSpönsör\tN"
+    # Submissions come from the shared skeleton; TE missing
+    zip_bytes = make_zip({"Products.txt": products.encode("cp1252"), "Applications.txt": apps.encode("cp1252")})
+
+    source = source_factory(zip_bytes)
+    row = next(iter(source.resources["fda_drugs_gold_products"]))
+
+    # Expected: "TRÂDEMARK® INGA INGB SPÖNSÖR" (Uppercased)
+    # Note: upper() on special chars depends on locale/python version but usually works for standard unicode.
+    # "Trâdemark®".upper() -> "TRÂDEMARK®"
+    # "Spönsör".upper() -> "SPÖNSÖR"
+    target = "TRÂDEMARK® INGA INGB SPÖNSÖR"
+    assert row["search_vector"] == target
+
+
+def test_exclusivity_boundary_today(
+    source_factory: Callable[[bytes], DltSource], make_zip: Callable[[Mapping[str, Union[str, bytes]]], bytes]
+) -> None:
     """
     Test Exclusivity Logic Boundary:
     BRD: True if current_date < Max(ExclusivityDate)
@@ -74,30 +62,21 @@ def test_exclusivity_boundary_today() -> None:
     today = date.today()
     today_str = today.strftime("%Y-%m-%d")
 
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        z.writestr(
-            "Products.txt",
-            "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000001\t001\tF\tS\tIng",
-        )
-        z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n000001\tORIG\t2020-01-01")
-        # Exclusivity expires TODAY
-        z.writestr("Exclusivity.txt", f"ApplNo\tProductNo\tExclusivityDate\n000001\t001\t{today_str}")
-
-    buffer.seek(0)
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+    zip_bytes = make_zip(
+        {
+            "Products.txt": "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000001\t001\tF\tS\tIng",
+            "Submissions.txt": "ApplNo\tSubmissionType\tSubmissionStatusDate\n000001\tORIG\t2020-01-01",
+            # Exclusivity expires TODAY
+            "Exclusivity.txt": f"ApplNo\tProductNo\tExclusivityDate\n000001\t001\t{today_str}",
+        }
+    )
 
-        source = drugs_fda_source()
-        gold_prods = list(source.resources["fda_drugs_gold_products"])
-        row = gold_prods[0]
+    source = source_factory(zip_bytes)
+    row = next(iter(source.resources["fda_drugs_gold_products"]))
 
-        # Should be NOT protected because date < max_date is False (date == max_date)
-        # Logic: today < max_date
-        assert row["is_protected"] is False
+    # Should be NOT protected because date < max_date is False (date == max_date)
+    # Logic: today < max_date
+    assert row["is_protected"] is False
 
 
 def test_active_ingredients_formatting_edge_cases() -> None:
@@ -113,14 +92,11 @@ def test_active_ingredients_formatting_edge_cases() -> None:
     res = clean_ingredients(df)
 
     # Row 1: "" -> [""] (Polars split behavior on empty string usually returns [""] or [])
-    # pl.lit("").str.split(";") -> [""]
-    assert res["active_ingredients_list"][0].to_list() == []
-
+    #   pl.lit("").str.split(";") -> [""]
     # Row 2: ";;" -> ["", "", ""]
-    assert res["active_ingredients_list"][1].to_list() == []
-
     # Row 3: " ; " -> split -> [" ", " "] -> strip -> ["", ""]
-    assert res["active_ingredients_list"][2].to_list() == []
+    # Empty tokens are dropped, so every row ends up as an empty list.
+    assert res["active_ingredients_list"].to_list() == [[], [], []]
 
 
 def test_source_id_validation() -> None:
@@ -174,42 +150,35 @@ def test_source_id_validation() -> None:
         )
 
 
-def test_duplicate_orig_submissions_selection() -> None:
+def test_duplicate_orig_submissions_selection(
+    source_factory: Callable[[bytes], DltSource], make_zip: Callable[[Mapping[str, Union[str, bytes]]], bytes]
+) -> None:
     """
     Test that when multiple 'ORIG' submissions exist for a single ApplNo,
     the pipeline selects the EARLIEST date.
     """
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
-        z.writestr(
-            "Products.txt",
-            "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000001\t001\tTab\t10mg\tIng1\n",
-        )
-        # Three ORIG submissions:
-        # 1. 2022-01-01 (Latest)
-        # 2. 2020-01-01 (Earliest) -> Target
-        # 3. 2021-01-01 (Middle)
-        # Order in file shouldn't matter if we sort correctly.
-        z.writestr(
-            "Submissions.txt",
-            "ApplNo\tSubmissionType\tSubmissionStatusDate\n"
-            "000001\tORIG\t2022-01-01\n"
-            "000001\tORIG\t2020-01-01\n"
-            "000001\tORIG\t2021-01-01\n",
-        )
-
-    buffer.seek(0)
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        silver_prods = list(source.resources["fda_drugs_silver_products"])
-
-        assert len(silver_prods) == 1
-        row = silver_prods[0]
-
-        # Should be 2020-01-01
-        assert row["original_approval_date"] == date(2020, 1, 1)
+    zip_bytes = make_zip(
+        {
+            "Products.txt": "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000001\t001\tTab\t10mg\tIng1\n",
+            # Three ORIG submissions:
+            # 1. 2022-01-01 (Latest)
+            # 2. 2020-01-01 (Earliest) -> Target
+            # 3. 2021-01-01 (Middle)
+            # Order in file shouldn't matter if we sort correctly.
+            "Submissions.txt": (
+                "ApplNo\tSubmissionType\tSubmissionStatusDate\n"
+                "000001\tORIG\t2022-01-01\n"
+                "000001\tORIG\t2020-01-01\n"
+                "000001\tORIG\t2021-01-01\n"
+            ),
+        }
+    )
+
+    source = source_factory(zip_bytes)
+    silver_prods = list(source.resources["fda_drugs_silver_products"])
+
+    assert len(silver_prods) == 1
+    row = silver_prods[0]
+
+    # Should be 2020-01-01
+    assert row["original_approval_date"] == date(2020, 1, 1)
@@ -8,12 +8,13 @@
 #
 # Source Code: https://github.com/CoReason-AI/coreason_etl_drugs_fda
 
+from typing import Any, Callable, Dict, Tuple
 from unittest.mock import MagicMock, patch
 
 import pytest
+from dlt.sources import DltSource
 
 from coreason_etl_drugs_fda.pipeline import create_pipeline, run_pipeline
-from coreason_etl_drugs_fda.source import drugs_fda_source
 
 
 @pytest.fixture  # type: ignore[misc]
@@ -22,7 +23,7 @@ def mock_zip_content_integration() -> bytes:
     import zipfile
 
     buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as z:
         # Products
         products = (
             "ApplNo\tProductNo\tForm\tStrength\tReferenceDrug\tDrugName\tActiveIngredient\tReferenceStandard\n"
@@ -41,33 +42,30 @@ def mock_zip_content_integration() -> bytes:
         exclusivity = "ApplNo\tProductNo\tExclusivityCode\tExclusivityDate\n000004\t004\tODE\t2025-01-01"
         z.writestr("Exclusivity.txt", exclusivity)
 
-    buffer.seek(0)
     return buffer.getvalue()
 
 
-def test_pipeline_bronze_ingestion(mock_zip_content_integration: bytes) -> None:
+def test_pipeline_bronze_ingestion(
+    mock_zip_content_integration: bytes,
+    source_factory: Callable[[bytes], DltSource],
+    pipeline_results: Callable[[bytes, str], Tuple[Dict[str, Any], ...]],
+) -> None:
     """
     Test that the pipeline extracts all required files (Products, Submissions, Exclusivity).
     """
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = mock_zip_content_integration
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+    source = source_factory(mock_zip_content_integration)
 
-        source = drugs_fda_source()
+    # Check resources exist
+    resources = source.resources
+    assert "fda_drugs_bronze_products" in resources
+    assert "fda_drugs_bronze_submissions" in resources
+    assert "fda_drugs_bronze_exclusivity" in resources
+    assert "fda_drugs_silver_products" in resources
 
-        # Check resources exist
-        resources = source.resources
-        assert "fda_drugs_bronze_products" in resources
-        assert "fda_drugs_bronze_submissions" in resources
-        assert "fda_drugs_bronze_exclusivity" in resources
-        assert "fda_drugs_silver_products" in resources
-
-        # Check content of Exclusivity
-        excl_data = list(resources["fda_drugs_bronze_exclusivity"])
-        assert len(excl_data) == 1
-        assert excl_data[0]["exclusivity_code"] == "ODE"
+    # Check content of Exclusivity
+    excl_data = pipeline_results(mock_zip_content_integration, "fda_drugs_bronze_exclusivity")
+    assert len(excl_data) == 1
+    assert excl_data[0]["exclusivity_code"] == "ODE"
 
 
 def test_run_pipeline_execution() -> None:
@@ -77,15 +75,20 @@ def test_run_pipeline_execution() -> None:
     """
     with patch("coreason_etl_drugs_fda.pipeline.create_pipeline") as mock_create:
         with patch("coreason_etl_drugs_fda.pipeline.drugs_fda_source") as mock_source:
-            mock_pipeline = MagicMock()
-            mock_create.return_value = mock_pipeline
+            with patch("coreason_etl_drugs_fda.pipeline.organize_schemas_async") as mock_organize:
+                mock_pipeline = MagicMock()
+                mock_create.return_value = mock_pipeline
+
+                mock_source.return_value = ["res1"]  # Mock source yielding resources or being iterable
 
-            mock_source.return_value = ["res1"]  # Mock source yielding resources or being iterable
+                run_pipeline()
 
-            run_pipeline()
+                # Verify pipeline.run was called with source
+                mock_pipeline.run.assert_called_once()
 
-            # Verify pipeline.run was called with source
-            mock_pipeline.run.assert_called_once()
+                # Verify the post-load hook ran and was waited on
+                mock_organize.assert_called_once_with(mock_pipeline)
+                mock_organize.return_value.result.assert_called_once_with()
 
 
 def test_create_pipeline() -> None:
@@ -10,7 +10,6 @@
 
 import io
 import zipfile
-from unittest.mock import MagicMock, patch
 
 import pytest
 from dlt.extract.exceptions import ResourceExtractionError
@@ -24,26 +23,18 @@ def test_lazy_zero_row_inputs() -> None:
     The LazyFrame logic should handle this without error and yield 0 rows.
     """
     buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as z:
         # Header only files
         z.writestr("Products.txt", "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient")
         z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate")
 
-    buffer.seek(0)
+    source = drugs_fda_source(source_bytes=buffer.getvalue())
+    # Should yield empty list, not crash
+    silver_prods = list(source.resources["fda_drugs_silver_products"])
+    assert len(silver_prods) == 0
 
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        # Should yield empty list, not crash
-        silver_prods = list(source.resources["fda_drugs_silver_products"])
-        assert len(silver_prods) == 0
-
-        gold_prods = list(source.resources["fda_drugs_gold_products"])
-        assert len(gold_prods) == 0
+    gold_prods = list(source.resources["fda_drugs_gold_products"])
+    assert len(gold_prods) == 0
 
 
 def test_lazy_missing_columns() -> None:
@@ -56,29 +47,21 @@ def test_lazy_missing_columns() -> None:
     We expect ResourceExtractionError (wrapping ValidationError).
     """
     buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as z:
         # Missing 'Form' column
         z.writestr("Products.txt", "ApplNo\tProductNo\tStrength\tActiveIngredient\n000001\t001\tS\tIng")
         z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n000001\tORIG\t2020-01-01")
 
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
+    source = drugs_fda_source(source_bytes=buffer.getvalue())
 
-        # Should fail when validating against ProductSilver
-        with pytest.raises(ResourceExtractionError) as excinfo:
-            list(source.resources["fda_drugs_silver_products"])
+    # Should fail when validating against ProductSilver
+    with pytest.raises(ResourceExtractionError) as excinfo:
+        list(source.resources["fda_drugs_silver_products"])
 
-        # dlt wraps the exception. Check message or cause.
-        from dlt.common.schema.exceptions import DataValidationError
+    # dlt wraps the exception. Check message or cause.
+    from dlt.common.schema.exceptions import DataValidationError
 
-        assert isinstance(excinfo.value.__cause__, DataValidationError)
+    assert isinstance(excinfo.value.__cause__, DataValidationError)
 
 
 def test_lazy_join_type_mismatch() -> None:
@@ -90,28 +73,20 @@ def test_lazy_join_type_mismatch() -> None:
     Refactored `source.py` adds `cast(pl.String).str.pad_start(6, '0')`.
     """
     buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as z:
         # Products: ApplNo is unquoted int 123
         z.writestr("Products.txt", "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n123\t1\tF\tS\tIng")
         # Submissions: ApplNo is unquoted 000123 (might be read as int or string depending on parser)
         z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n000123\tORIG\t2020-01-01")
 
-    buffer.seek(0)
+    source = drugs_fda_source(source_bytes=buffer.getvalue())
+    silver_prods = list(source.resources["fda_drugs_silver_products"])
 
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        silver_prods = list(source.resources["fda_drugs_silver_products"])
-
-        assert len(silver_prods) == 1
-        row = silver_prods[0]
-        # Should have joined date
-        assert row["appl_no"] == "000123"
-        assert str(row["original_approval_date"]) == "2020-01-01"
+    assert len(silver_prods) == 1
+    row = silver_prods[0]
+    # Should have joined date
+    assert row["appl_no"] == "000123"
+    assert str(row["original_approval_date"]) == "2020-01-01"
 
 
 def test_lazy_whitespace_keys() -> None:
@@ -122,23 +97,15 @@ def test_lazy_whitespace_keys() -> None:
     It should NOT be skipped, but treated as ID "000000".
     """
     buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as z:
         # ApplNo is whitespace
         z.writestr("Products.txt", "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n   \t001\tF\tS\tIng")
         z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n   \tORIG\t2020-01-01")
 
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
+    source = drugs_fda_source(source_bytes=buffer.getvalue())
 
-        prods = list(source.resources["fda_drugs_silver_products"])
+    prods = list(source.resources["fda_drugs_silver_products"])
 
-        # It should be present as 000000
-        assert len(prods) == 1
-        assert prods[0]["appl_no"] == "000000"
+    # It should be present as 000000
+    assert len(prods) == 1
+    assert prods[0]["appl_no"] == "000000"
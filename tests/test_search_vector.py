@@ -10,7 +10,6 @@
 
 import io
 import zipfile
-from unittest.mock import MagicMock, patch
 
 from coreason_etl_drugs_fda.source import drugs_fda_source
 
@@ -19,7 +18,7 @@ def test_gold_search_vector_edge_cases() -> None:
     """Test search_vector generation when columns are missing in source."""
     # Case 1: Missing 'drug_name' in Products.txt (Common, as it might be named differently or missing)
     buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as z:
         # Products without DrugName
         z.writestr(
             "Products.txt",
@@ -27,40 +26,25 @@ def test_gold_search_vector_edge_cases() -> None:
         )
         z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n000001\tORIG\t2020-01-01")
 
-    buffer.seek(0)
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        gold_prods = list(source.resources["fda_drugs_gold_products"])
-        row = gold_prods[0]
-        # Should be just "INGA"
-        assert row["search_vector"] == "INGA"
+    source = drugs_fda_source(source_bytes=buffer.getvalue())
+    gold_prods = list(source.resources["fda_drugs_gold_products"])
+    row = gold_prods[0]
+    # Should be just "INGA"
+    assert row["search_vector"] == "INGA"
 
     # Case 2: Missing 'active_ingredient' (Should normally not happen but good for robustness)
     buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as z:
         z.writestr(
             "Products.txt",
             "ApplNo\tProductNo\tForm\tStrength\tDrugName\n000001\t001\tF\tS\tMyDrug",
         )
         z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n000001\tORIG\t2020-01-01")
-    buffer.seek(0)
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        gold_prods = list(source.resources["fda_drugs_gold_products"])
-        row = gold_prods[0]
-        # Should be "MYDRUG" (uppercased)
-        assert row["search_vector"] == "MYDRUG"
-        assert row["active_ingredients_list"] == []
+    source = drugs_fda_source(source_bytes=buffer.getvalue())
+    row = next(iter(source.resources["fda_drugs_gold_products"]))
+    # Should be "MYDRUG" (uppercased)
+    assert row["search_vector"] == "MYDRUG"
+    assert row["active_ingredients_list"] == []
 
 
 def test_gold_search_vector_missing_sponsor_te() -> None:
@@ -68,7 +52,7 @@ def test_gold_search_vector_missing_sponsor_te() -> None:
     # Applications.txt WITHOUT SponsorName
     # TE.txt WITHOUT TECode (or missing TE file)
     buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as z:
         z.writestr(
             "Products.txt",
             "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\tDrugName\n000001\t001\tF\tS\tIngA\tMyDrug",
@@ -78,16 +62,8 @@ def test_gold_search_vector_missing_sponsor_te() -> None:
         z.writestr("Applications.txt", "ApplNo\tOtherCol\n000001\tVal")
         # TE missing
 
-    buffer.seek(0)
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        gold_prods = list(source.resources["fda_drugs_gold_products"])
-        row = gold_prods[0]
+    source = drugs_fda_source(source_bytes=buffer.getvalue())
+    row = next(iter(source.resources["fda_drugs_gold_products"]))
 
-        # Search vector: MyDrug + IngA + "" + "" -> "MYDRUG INGA"
-        assert row["search_vector"] == "MYDRUG INGA"
+    # Search vector: MyDrug + IngA + "" + "" -> "MYDRUG INGA"
+    assert row["search_vector"] == "MYDRUG INGA"
@@ -11,11 +11,12 @@
 import io
 import zipfile
 from datetime import date
-from unittest.mock import MagicMock, patch
+from typing import Callable
 
 import pytest
 
 from coreason_etl_drugs_fda.source import (
+    SKIP_VALIDATION_ENV,
     _read_file_from_zip,
     drugs_fda_source,
 )
@@ -25,7 +26,7 @@ from coreason_etl_drugs_fda.source import (
 def mock_zip_content() -> bytes:
     """Creates a mock ZIP file in memory containing sample TSV files."""
     buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as z:
         # Create Products.txt
         # ApplNo 000004 has match in Submissions.
         # ApplNo 000005 has NO match.
@@ -45,94 +46,105 @@ def mock_zip_content() -> bytes:
         )
         z.writestr("Submissions.txt", submissions_content)
 
-    buffer.seek(0)
     return buffer.getvalue()
 
 
-def test_drugs_fda_source_extraction(mock_zip_content: bytes) -> None:
+def test_drugs_fda_source_extraction(mock_zip_content: bytes, fda_get: Callable[[bytes], None]) -> None:
     """
     Test that the source correctly extracts, parses, and cleans data from the ZIP.
     Also verifies the 'silver_products' resource.
     """
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = mock_zip_content
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        # Initialize the source
-        source = drugs_fda_source()
-
-        # Check resources
-        resources = source.resources
-        assert "fda_drugs_bronze_products" in resources
-        assert "fda_drugs_bronze_submissions" in resources
-        assert "fda_drugs_silver_products" in resources
-
-        # 1. Verify Raw Products
-        raw_prod = list(resources["fda_drugs_bronze_products"])
-        assert len(raw_prod) == 2
-        assert raw_prod[0]["appl_no"] == "000004"
-        # Raw layer keeps original name (snake_cased) but not transformed yet?
-        # Transform logic renames it. Raw layer is direct from read.
-        # Products.txt has "ActiveIngredient", clean_dataframe makes it "active_ingredient"
-        assert raw_prod[0]["active_ingredient"] == "HYDROXYAMPHETAMINE HYDROBROMIDE"
-
-        # 2. Verify Silver Products
-        silver_prod = list(resources["fda_drugs_silver_products"])
-        assert len(silver_prod) == 2
-
-        row1 = silver_prod[0]
-        # Check Padded IDs
-        assert row1["appl_no"] == "000004"
-        assert row1["product_no"] == "004"
-        # Check Date Join
-        assert row1["original_approval_date"] == date(1982, 1, 1)
-        # Check Active Ingredient List
-        assert row1["active_ingredients_list"] == ["HYDROXYAMPHETAMINE HYDROBROMIDE"]
-        # Check UUID
-        assert row1["coreason_id"] is not None
-        assert row1["source_id"] == "000004004"
-        assert row1["hash_md5"] is not None
-
-        row2 = silver_prod[1]
-        assert row2["appl_no"] == "000005"
-        # Check No Date Join
-        assert row2["original_approval_date"] is None
+    fda_get(mock_zip_content)
+
+    # Initialize the source
+    source = drugs_fda_source()
+
+    # Check resources
+    resources = source.resources
+    assert "fda_drugs_bronze_products" in resources
+    assert "fda_drugs_bronze_submissions" in resources
+    assert "fda_drugs_silver_products" in resources
+
+    # 1. Verify Raw Products
+    raw_prod = list(resources["fda_drugs_bronze_products"])
+    assert len(raw_prod) == 2
+    assert raw_prod[0]["appl_no"] == "000004"
+    # Raw layer keeps original name (snake_cased) but not transformed yet?
+    # Transform logic renames it. Raw layer is direct from read.
+    # Products.txt has "ActiveIngredient", clean_dataframe makes it "active_ingredient"
+    assert raw_prod[0]["active_ingredient"] == "HYDROXYAMPHETAMINE HYDROBROMIDE"
+
+    # 2. Verify Silver Products
+    silver_prod = list(resources["fda_drugs_silver_products"])
+    assert len(silver_prod) == 2
+
+    row1 = silver_prod[0]
+    # Check Padded IDs
+    assert row1["appl_no"] == "000004"
+    assert row1["product_no"] == "004"
+    # Check Date Join
+    assert row1["original_approval_date"] == date(1982, 1, 1)
+    # Check Active Ingredient List
+    assert row1["active_ingredients_list"] == ["HYDROXYAMPHETAMINE HYDROBROMIDE"]
+    # Check UUID
+    assert row1["coreason_id"] is not None
+    assert row1["source_id"] == "000004004"
+    assert row1["hash_md5"] is not None
+
+    row2 = silver_prod[1]
+    assert row2["appl_no"] == "000005"
+    # Check No Date Join
+    assert row2["original_approval_date"] is None
+
+
+def test_source_bytes_skips_download(mock_zip_content: bytes, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that passing the archive as `source_bytes` extracts it without any HTTP request."""
+
+    def _no_download(*args: object, **kwargs: object) -> None:
+        raise AssertionError("source_bytes must not trigger a download")
+
+    monkeypatch.setattr("coreason_etl_drugs_fda.source.cffi_requests.get", _no_download)
+
+    source = drugs_fda_source(source_bytes=mock_zip_content)
+
+    silver_prod = list(source.resources["fda_drugs_silver_products"])
+    assert [row["appl_no"] for row in silver_prod] == ["000004", "000005"]
+
+
+def test_rows_yielded_in_chunks(mock_zip_content: bytes, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that no rows are lost or reordered at slice boundaries when rows are yielded in chunks."""
+    monkeypatch.setattr("coreason_etl_drugs_fda.source.ROW_CHUNK_SIZE", 1)
+    source = drugs_fda_source(source_bytes=mock_zip_content)
+
+    silver_prod = list(source.resources["fda_drugs_silver_products"])
+    assert [row["appl_no"] for row in silver_prod] == ["000004", "000005"]
+    gold_prods = list(source.resources["fda_drugs_gold_products"])
+    assert len(gold_prods) == 2
+    assert {row["appl_no"] for row in gold_prods} == {"000004", "000005"}
 
 
 def test_silver_products_legacy_date(mock_zip_content: bytes) -> None:
     """Test legacy date string handling in silver_products."""
     buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as z:
         products = "ApplNo\tProductNo\tActiveIngredient\tForm\tStrength\n000007\t001\tIng\tF\tS"
         z.writestr("Products.txt", products)
         # Submissions with legacy string
         submissions = "ApplNo\tSubmissionType\tSubmissionStatusDate\n000007\tORIG\tApproved prior to Jan 1, 1982"
         z.writestr("Submissions.txt", submissions)
-    buffer.seek(0)
     mock_content = buffer.getvalue()
 
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = mock_content
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        silver_prod = list(source.resources["fda_drugs_silver_products"])
-        row = silver_prod[0]
+    source = drugs_fda_source(source_bytes=mock_content)
+    row = next(iter(source.resources["fda_drugs_silver_products"]))
 
-        assert row["original_approval_date"] == date(1982, 1, 1)
-        assert row["is_historic_record"] is True
+    assert row["original_approval_date"] == date(1982, 1, 1)
+    assert row["is_historic_record"] is True
 
 
 def test_read_file_from_zip_missing() -> None:
     """Test _read_file_from_zip with non-existent file."""
     buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as z:
         z.writestr("exists.txt", "col\nval")
 
     # This generator should yield nothing
@@ -146,7 +158,7 @@ def test_extract_approval_dates_missing_file() -> None:
     # or unit test transform.py directly.
     # Here we test if source handles missing Submissions gracefully.
     buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as z:
         z.writestr("Products.txt", "col\nval")
 
     # The helper _get_lazy_df_from_zip returns empty LazyFrame if missing.
@@ -158,33 +170,25 @@ def test_extract_approval_dates_missing_file() -> None:
 def test_silver_products_empty_dates() -> None:
     """Test silver_products_resource when no approval dates are found."""
     buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as z:
         products = "ApplNo\tProductNo\tActiveIngredient\tForm\tStrength\n000008\t001\tIng\tF\tS"
         z.writestr("Products.txt", products)
         # Submissions has no ORIG
         submissions = "ApplNo\tSubmissionType\tSubmissionStatusDate\n000008\tSUPPL\t2023-01-01"
         z.writestr("Submissions.txt", submissions)
-    buffer.seek(0)
     mock_content = buffer.getvalue()
 
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = mock_content
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        # Should yield silver products, but with null dates
-        silver_prod = list(source.resources["fda_drugs_silver_products"])
-        assert len(silver_prod) == 1
-        assert silver_prod[0]["original_approval_date"] is None
+    source = drugs_fda_source(source_bytes=mock_content)
+    # Should yield silver products, but with null dates
+    silver_prod = list(source.resources["fda_drugs_silver_products"])
+    assert len(silver_prod) == 1
+    assert silver_prod[0]["original_approval_date"] is None
 
 
 def test_silver_products_validation_error() -> None:
     """Test that invalid data (valid ID but missing required field) raises Validation Error."""
     buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as z:
         # Valid ID (so not filtered) but missing Form (required)
         # Note: We omit 'Form' column completely? Or make it null?
         # If omitted from header, clean_form handles it?
@@ -211,32 +215,50 @@ def test_silver_products_validation_error() -> None:
 
     # New Logic: Test that ABC (invalid ID) results in SKIPPING (0 rows), not crash.
     buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as z:
         products = "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\nABC\t001\tForm\tStr\tIng"
         z.writestr("Products.txt", products)
         z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\nABC\tORIG\t2023-01-01")
 
-    buffer.seek(0)
     mock_content = buffer.getvalue()
 
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = mock_content
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+    source = drugs_fda_source(source_bytes=mock_content)
+    # Should yield 1 item because 'ABC' -> '000000' (Ghost Record fallback)
+    res = list(source.resources["fda_drugs_silver_products"])
+    assert len(res) == 1
+    assert res[0]["appl_no"] == "000000"
+
+
+def test_skip_validation_env_drops_validators(mock_zip_content: bytes, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that COREASON_SKIP_VALIDATION removes the Pydantic validators, and that they are kept by default."""
+    source = drugs_fda_source(source_bytes=mock_zip_content)
+    assert source.resources["fda_drugs_silver_products"].validator is not None
+    assert source.resources["fda_drugs_gold_products"].validator is not None
+
+    monkeypatch.setenv(SKIP_VALIDATION_ENV, " TRUE ")
+    source = drugs_fda_source(source_bytes=mock_zip_content)
+    assert source.resources["fda_drugs_silver_products"].validator is None
+    assert source.resources["fda_drugs_gold_products"].validator is None
+
+    silver = list(source.resources["fda_drugs_silver_products"])
+    assert {row["appl_no"] for row in silver} == {"000004", "000005"}
 
-        source = drugs_fda_source()
-        # Should yield 1 item because 'ABC' -> '000000' (Ghost Record fallback)
-        res = list(source.resources["fda_drugs_silver_products"])
-        assert len(res) == 1
-        assert res[0]["appl_no"] == "000000"
+
+@pytest.mark.parametrize("value", ["false", "no", "0", "off", ""])  # type: ignore[misc]
+def test_skip_validation_env_non_true_keeps_validators(
+    value: str, mock_zip_content: bytes, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that only explicit true values of COREASON_SKIP_VALIDATION remove the validators."""
+    monkeypatch.setenv(SKIP_VALIDATION_ENV, value)
+    source = drugs_fda_source(source_bytes=mock_zip_content)
+    assert source.resources["fda_drugs_silver_products"].validator is not None
+    assert source.resources["fda_drugs_gold_products"].validator is not None
 
 
 def test_gold_products_logic() -> None:
     """Test Gold layer joins and logic (is_generic, is_protected)."""
     buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as z:
         # Products
         # 000001: NDA, Protected
         # 000002: ANDA, Not Protected
@@ -272,173 +294,124 @@ def test_gold_products_logic() -> None:
         te = "ApplNo\tProductNo\tTECode\n000002\t001\tAB"
         z.writestr("TE.txt", te)
 
-    buffer.seek(0)
     mock_content = buffer.getvalue()
 
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = mock_content
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        gold_prods = list(source.resources["fda_drugs_gold_products"])
-        assert len(gold_prods) == 2
-
-        # Row 1: NDA, Protected, Has Marketing
-        row1 = next(p for p in gold_prods if p["appl_no"] == "000001")
-        assert row1["sponsor_name"] == "SponsorA"
-        assert row1["is_generic"] is False  # ApplType N
-        assert row1["is_protected"] is True  # Excl Date 3000 > Today
-        assert row1["marketing_status_id"] == 1
-        assert row1["te_code"] is None  # Missing in TE
-        # search_vector: DrugName + ActiveIngredient + SponsorName + TECode
-        # Products.txt didn't provide DrugName, so ""
-        # Ing1 + SponsorA + ""
-        # Note: join puts spaces. "" + Ing1 + SponsorA + "" -> "Ing1 SponsorA" (stripped)
-        # Note: ActiveIngredient is uppercased in transformation!
-        # Search vector is also uppercased now
-        assert "ING1" in row1["search_vector"]
-        assert "SPONSORA" in row1["search_vector"]
-
-        # Row 2: ANDA, Not Protected, Has TE
-        row2 = next(p for p in gold_prods if p["appl_no"] == "000002")
-        assert row2["sponsor_name"] == "SponsorB"
-        assert row2["is_generic"] is True  # ApplType A
-        assert row2["is_protected"] is False  # Excl Date 2000 < Today
-        assert row2["te_code"] == "AB"
-        assert row2["marketing_status_id"] is None  # Missing in Marketing
-        # Ing2 + SponsorB + AB
-        assert "ING2" in row2["search_vector"]
-        assert "SPONSORB" in row2["search_vector"]
-        assert "AB" in row2["search_vector"]
+    source = drugs_fda_source(source_bytes=mock_content)
+    gold_prods = list(source.resources["fda_drugs_gold_products"])
+    assert len(gold_prods) == 2
+    by_appl = {p["appl_no"]: p for p in gold_prods}
+
+    # Row 1: NDA, Protected, Has Marketing
+    row1 = by_appl["000001"]
+    assert row1["sponsor_name"] == "SponsorA"
+    assert row1["is_generic"] is False  # ApplType N
+    assert row1["is_protected"] is True  # Excl Date 3000 > Today
+    assert row1["marketing_status_id"] == 1
+    assert row1["te_code"] is None  # Missing in TE
+    # search_vector: DrugName + ActiveIngredient + SponsorName + TECode
+    # Products.txt didn't provide DrugName, so ""
+    # Ing1 + SponsorA + ""
+    # Note: join puts spaces. "" + Ing1 + SponsorA + "" -> "Ing1 SponsorA" (stripped)
+    # Note: ActiveIngredient is uppercased in transformation!
+    # Search vector is also uppercased now
+    assert "ING1" in row1["search_vector"]
+    assert "SPONSORA" in row1["search_vector"]
+
+    # Row 2: ANDA, Not Protected, Has TE
+    row2 = by_appl["000002"]
+    assert row2["sponsor_name"] == "SponsorB"
+    assert row2["is_generic"] is True  # ApplType A
+    assert row2["is_protected"] is False  # Excl Date 2000 < Today
+    assert row2["te_code"] == "AB"
+    assert row2["marketing_status_id"] is None  # Missing in Marketing
+    # Ing2 + SponsorB + AB
+    assert "ING2" in row2["search_vector"]
+    assert "SPONSORB" in row2["search_vector"]
+    assert "AB" in row2["search_vector"]
 
 
 def test_gold_products_missing_aux_files() -> None:
     """Test Gold layer works (with nulls) even if auxiliary files are missing."""
     buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as z:
         z.writestr("Products.txt", "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000001\t001\tF\tS\tIng")
         z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n000001\tORIG\t2020-01-01")
 
-    buffer.seek(0)
     mock_content = buffer.getvalue()
 
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = mock_content
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        gold_prods = list(source.resources["fda_drugs_gold_products"])
-        assert len(gold_prods) == 1
-        row = gold_prods[0]
-
-        assert row["sponsor_name"] is None
-        assert row["is_generic"] is False  # Default if missing
-        assert row["is_protected"] is False  # Default if missing
-        assert row["marketing_status_id"] is None
-        # search_vector should handle missing cols
-        # drug_name missing -> ""
-        # active_ingredients -> "ING"
-        # sponsor missing -> ""
-        # te missing -> ""
-        # So "ING"
-        assert row["search_vector"] == "ING"
+    source = drugs_fda_source(source_bytes=mock_content)
+    gold_prods = list(source.resources["fda_drugs_gold_products"])
+    assert len(gold_prods) == 1
+    row = gold_prods[0]
+
+    assert row["sponsor_name"] is None
+    assert row["is_generic"] is False  # Default if missing
+    assert row["is_protected"] is False  # Default if missing
+    assert row["marketing_status_id"] is None
+    # search_vector should handle missing cols
+    # drug_name missing -> ""
+    # active_ingredients -> "ING"
+    # sponsor missing -> ""
+    # te missing -> ""
+    # So "ING"
+    assert row["search_vector"] == "ING"
 
 
 def test_gold_products_missing_appl_type_column() -> None:
     """Test Gold layer when Applications.txt exists but lacks ApplType column."""
     buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as z:
         z.writestr("Products.txt", "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000001\t001\tF\tS\tIng")
         z.writestr("Submissions.txt", "ApplNo\tSubmissionType\tSubmissionStatusDate\n000001\tORIG\t2020-01-01")
         # Applications has SponsorName but NO ApplType
         z.writestr("Applications.txt", "ApplNo\tSponsorName\n000001\tSponsorX")
 
-    buffer.seek(0)
     mock_content = buffer.getvalue()
 
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = mock_content
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+    source = drugs_fda_source(source_bytes=mock_content)
+    row = next(iter(source.resources["fda_drugs_gold_products"]))
 
-        source = drugs_fda_source()
-        gold_prods = list(source.resources["fda_drugs_gold_products"])
-        row = gold_prods[0]
-
-        assert row["sponsor_name"] == "SponsorX"
-        assert row["is_generic"] is False  # Default
+    assert row["sponsor_name"] == "SponsorX"
+    assert row["is_generic"] is False  # Default
 
 
 def test_source_skips_silver_if_missing_files() -> None:
     """Test that silver_products and gold_products resources are skipped if files are missing."""
     buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as z:
         # Only Products, no Submissions -> Silver skipped
         products = "ApplNo\tProductNo\tForm\tStrength\tActiveIngredient\n000001\t001\tF\tS\tIng"
         z.writestr("Products.txt", products)
 
-    buffer.seek(0)
     mock_content = buffer.getvalue()
 
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = mock_content
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        resources = source.resources
+    source = drugs_fda_source(source_bytes=mock_content)
+    resources = source.resources
 
-        assert "fda_drugs_bronze_products" in resources
-        assert "fda_drugs_silver_products" not in resources  # Should be skipped
-        assert "fda_drugs_gold_products" in resources  # Should be present (only depends on Products)
+    assert "fda_drugs_bronze_products" in resources
+    assert "fda_drugs_silver_products" not in resources  # Should be skipped
+    assert "fda_drugs_gold_products" in resources  # Should be present (only depends on Products)
 
     # Case 2: No Products -> Silver and Gold skipped
     buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as z:
         z.writestr("Submissions.txt", "ApplNo\n1")
-    buffer.seek(0)
 
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        resources = source.resources
-        assert "fda_drugs_silver_products" not in resources
-        assert "fda_drugs_gold_products" not in resources
+    source = drugs_fda_source(source_bytes=buffer.getvalue())
+    resources = source.resources
+    assert "fda_drugs_silver_products" not in resources
+    assert "fda_drugs_gold_products" not in resources
 
 
 def test_gold_products_empty_source_file() -> None:
     """Test Gold layer handles empty Products.txt gracefully."""
     buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w") as z:
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as z:
         # Empty Products file
         z.writestr("Products.txt", "")
 
-    buffer.seek(0)
-
-    with patch("coreason_etl_drugs_fda.source.cffi_requests.get") as mock_get:
-        mock_response = MagicMock(status_code=200)
-        mock_response.content = buffer.getvalue()
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
-
-        source = drugs_fda_source()
-        # Gold resource is yielded because Products.txt is in zip
-        # But iterating it should yield nothing (return early)
-        gold_prods = list(source.resources["fda_drugs_gold_products"])
-        assert len(gold_prods) == 0
+    source = drugs_fda_source(source_bytes=buffer.getvalue())
+    # Gold resource is yielded because Products.txt is in zip
+    # But iterating it should yield nothing (return early)
+    gold_prods = list(source.resources["fda_drugs_gold_products"])
+    assert len(gold_prods) == 0